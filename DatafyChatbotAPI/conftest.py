@@ -0,0 +1 @@
+# Testlerin modules paketini bulabilmesi için bu dizin sys.path'e eklenir (pytest rootdir conftest)
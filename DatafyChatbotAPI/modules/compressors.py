@@ -0,0 +1,236 @@
+# compressors.py
+import re
+import json
+import time
+import numpy as np
+from typing import List, Dict, Any, Optional
+from langchain.schema import Document
+from langchain.prompts import PromptTemplate
+from langchain.chains import LLMChain
+from langchain.retrievers.document_compressors import LLMChainExtractor
+
+COMPRESSION_MODES = ["none", "llm_chain", "batched_llm", "lexical", "embedding"]
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = {
+    "ve", "ile", "bir", "bu", "şu", "için", "gibi", "da", "de", "ki", "mi", "mı",
+    "mu", "mü", "ne", "nasıl", "daha", "çok", "en", "olan", "ama", "veya", "ya"
+}
+
+
+def _tokenize(text: str) -> set:
+    # Türkçe büyük I/İ harflerini lower() öncesinde doğru eşle
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    return {w for w in _WORD.findall(text) if len(w) > 2 and w not in _STOPWORDS}
+
+
+def _split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+
+class BaseCompressor:
+    """
+    Retriever'dan gelen belgeleri sorguya göre daraltan aşamaların temel sınıfı
+    """
+    mode = "none"
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+    async def compress(self, query: str, docs: List[Document]) -> List[Document]:
+        """
+        Belgeleri sıkıştırır ve gecikmeyi kaydeder
+
+        Args:
+            query: Retriever'a gönderilen sorgu
+            docs: Vector store'dan gelen belgeler
+
+        Returns:
+            List[Document]: Sıkıştırılmış belgeler
+        """
+        if not docs:
+            return docs
+
+        started = time.perf_counter()
+        try:
+            return await self._compress(query, docs)
+        finally:
+            self.last_ms = (time.perf_counter() - started) * 1000
+            self.total_ms += self.last_ms
+            self.calls += 1
+
+    async def _compress(self, query: str, docs: List[Document]) -> List[Document]:
+        return docs
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "calls": self.calls,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else None,
+            "last_ms": round(self.last_ms, 1)
+        }
+
+
+class NoCompressor(BaseCompressor):
+    """
+    Belgeleri olduğu gibi döndürür
+    """
+    mode = "none"
+
+
+class LLMChainCompressor(BaseCompressor):
+    """
+    Belge başına bir LLM çağrısı yapan eski LLMChainExtractor davranışı
+    """
+    mode = "llm_chain"
+
+    def __init__(self, llm):
+        super().__init__()
+        self.extractor = LLMChainExtractor.from_llm(llm)
+
+    async def _compress(self, query: str, docs: List[Document]) -> List[Document]:
+        return list(await self.extractor.acompress_documents(docs, query))
+
+
+class BatchedLLMCompressor(BaseCompressor):
+    """
+    Tüm belgeleri tek bir LLM çağrısında sıkıştırır
+    """
+    mode = "batched_llm"
+
+    template = """
+    Given a question and a numbered list of passages, extract from each passage only the parts that are relevant to answering the question.
+    Copy the relevant text verbatim, do not paraphrase or add anything.
+    If a passage has nothing relevant, return an empty string for it.
+
+    Return ONLY a JSON object mapping the passage number to the extracted text, for example: {{"1": "...", "2": ""}}
+
+    Question: {question}
+
+    Passages:
+    {passages}
+    """
+
+    def __init__(self, llm):
+        super().__init__()
+        prompt = PromptTemplate(template=self.template, input_variables=["question", "passages"])
+        self.chain = LLMChain(llm=llm, prompt=prompt)
+
+    async def _compress(self, query: str, docs: List[Document]) -> List[Document]:
+        passages = "\n\n".join(f"[{i + 1}]\n{doc.page_content}" for i, doc in enumerate(docs))
+
+        try:
+            output = await self.chain.arun(question=query, passages=passages)
+            json_match = re.search(r"({.*})", output, re.DOTALL)
+            extracted = json.loads(json_match.group(1) if json_match else output)
+
+            compressed = []
+            for i, doc in enumerate(docs):
+                text = str(extracted.get(str(i + 1), "") or "").strip()
+                if text:
+                    compressed.append(Document(page_content=text, metadata=doc.metadata))
+            return compressed
+        except Exception as e:
+            # Sıkıştırma başarısızsa (JSON nesne değilse dahil) belgeleri kaybetmek yerine olduğu gibi kullan
+            print(f"Toplu sıkıştırma hatası: {str(e)}")
+            return docs
+
+
+class LexicalSentenceCompressor(BaseCompressor):
+    """
+    Sorguyla kelime örtüşmesi en yüksek cümleleri seçen yerel sıkıştırıcı
+    """
+    mode = "lexical"
+
+    def __init__(self, max_sentences: int = 4, min_overlap: int = 1):
+        super().__init__()
+        self.max_sentences = max_sentences
+        self.min_overlap = min_overlap
+
+    async def _compress(self, query: str, docs: List[Document]) -> List[Document]:
+        query_terms = _tokenize(query)
+        compressed = []
+
+        for doc in docs:
+            sentences = _split_sentences(doc.page_content)
+            scored = [(len(query_terms & _tokenize(sentence)), i) for i, sentence in enumerate(sentences)]
+            selected = sorted(
+                (item for item in scored if item[0] >= self.min_overlap),
+                reverse=True
+            )[:self.max_sentences]
+
+            if selected:
+                # Cümleleri belgedeki orijinal sıralarıyla birleştir
+                text = " ".join(sentences[i] for _, i in sorted(selected, key=lambda item: item[1]))
+                compressed.append(Document(page_content=text, metadata=doc.metadata))
+
+        return compressed
+
+
+class EmbeddingSentenceCompressor(BaseCompressor):
+    """
+    Cümleleri sorguya embedding benzerliğine göre seçen yerel sıkıştırıcı
+    """
+    mode = "embedding"
+
+    def __init__(self, embeddings, max_sentences: int = 4, min_similarity: float = 0.3):
+        super().__init__()
+        self.embeddings = embeddings
+        self.max_sentences = max_sentences
+        self.min_similarity = min_similarity
+
+    async def _compress(self, query: str, docs: List[Document]) -> List[Document]:
+        doc_sentences = [_split_sentences(doc.page_content) for doc in docs]
+        flat = [sentence for sentences in doc_sentences for sentence in sentences]
+        if not flat:
+            return []
+
+        # Tüm cümleler tek bir embedding çağrısında işlenir
+        query_vector = np.array(await self.embeddings.aembed_query(query), dtype=np.float32)
+        sentence_vectors = np.array(await self.embeddings.aembed_documents(flat), dtype=np.float32)
+
+        query_vector /= np.linalg.norm(query_vector)
+        sentence_vectors /= np.linalg.norm(sentence_vectors, axis=1, keepdims=True)
+        similarities = sentence_vectors @ query_vector
+
+        compressed = []
+        offset = 0
+        for doc, sentences in zip(docs, doc_sentences):
+            scores = similarities[offset:offset + len(sentences)]
+            offset += len(sentences)
+
+            ranked = [i for i in np.argsort(-scores)[:self.max_sentences] if scores[i] >= self.min_similarity]
+            if ranked:
+                text = " ".join(sentences[i] for i in sorted(ranked))
+                compressed.append(Document(page_content=text, metadata=doc.metadata))
+
+        return compressed
+
+
+def build_compressor(mode: str, llm=None, embeddings=None) -> BaseCompressor:
+    """
+    Mod adına göre sıkıştırıcı oluşturur
+
+    Args:
+        mode: "none", "llm_chain", "batched_llm", "lexical" veya "embedding"
+        llm: LLM tabanlı modlar için model
+        embeddings: "embedding" modu için embedding modeli
+
+    Returns:
+        BaseCompressor: İstenen sıkıştırıcı
+    """
+    mode = (mode or "none").lower()
+    if mode == "none":
+        return NoCompressor()
+    if mode == "llm_chain":
+        return LLMChainCompressor(llm)
+    if mode == "batched_llm":
+        return BatchedLLMCompressor(llm)
+    if mode == "lexical":
+        return LexicalSentenceCompressor()
+    if mode == "embedding":
+        return EmbeddingSentenceCompressor(embeddings)
+    raise ValueError(f"Desteklenmeyen sıkıştırma modu: {mode}. Geçerli modlar: {COMPRESSION_MODES}")
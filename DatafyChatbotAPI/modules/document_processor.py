@@ -1,39 +1,29 @@
 # document_processor.py
 import os
-import asyncio
-from typing import List, Dict, Any, Optional
-from langchain.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.vectorstores import Milvus
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.schema import Document
-from pymilvus import connections, utility, Collection, FieldSchema, CollectionSchema, DataType
-import os
-import uuid
-import asyncio
-import numpy as np
-from typing import List, Dict, Any, Optional
-from langchain.embeddings import OpenAIEmbeddings
-from pymilvus import connections, utility, Collection, FieldSchema, CollectionSchema, DataType
+from typing import List, Dict, Any, Optional, Tuple, Callable, AsyncIterator
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-import json
-import tempfile
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from pymilvus import utility, Collection, FieldSchema, CollectionSchema, DataType
+from modules.embedding_cache import get_shared_embeddings
+from modules.milvus_manager import get_milvus_manager
+from modules.executor import run_blocking
+from modules.ingestion import EmbeddingPipeline, IngestionManifest, chunk_fingerprint, chunk_entity_id, is_valid_collection_name
+from modules.pdf_extraction import ParallelPDFExtractor
 
 
 class DocumentService:
     """
     Döküman işleme servislerini yöneten sınıf
     """
-    def __init__(self, openai_api_key: str, milvus_host: str = "localhost", milvus_port: str = "19530"):
+    def __init__(self, openai_api_key: str, milvus_host: str = "localhost", milvus_port: str = "19530", ingestion_config: Optional[Dict[str, Any]] = None, extraction_config: Optional[Dict[str, Any]] = None):
         self.openai_api_key = openai_api_key
         self.milvus_host = milvus_host
         self.milvus_port = milvus_port
         
+        self.milvus = get_milvus_manager(milvus_host, milvus_port)
+        
         # Langchain'in PDFProcessor'ı yerine direct Milvus işleyici kullan
-        self.pdf_processor = DirectMilvusPDFProcessor(openai_api_key, milvus_host, milvus_port)
+        self.pdf_processor = DirectMilvusPDFProcessor(openai_api_key, milvus_host, milvus_port, ingestion_config, extraction_config)
         
         # Desteklenen koleksiyonları Milvus'tan yükle
         self.collections = {}
@@ -45,11 +35,7 @@ class DocumentService:
         """
         try:
             # Milvus'a bağlan
-            connections.connect(
-                alias="default", 
-                host=self.milvus_host, 
-                port=self.milvus_port
-            )
+            self.milvus.connect()
             
             # Tüm koleksiyonları listele
             milvus_collections = utility.list_collections()
@@ -72,7 +58,7 @@ class DocumentService:
         except Exception as e:
             print(f"Milvus'tan koleksiyon yükleme hatası: {str(e)}")
     
-    async def process_document(self, document_url: str, collection_name: str, document_type: str) -> Dict[str, Any]:
+    async def process_document(self, document_url: str, collection_name: str, document_type: str, source: Optional[str] = None, progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
         """
         Belirtilen dökümanı işler
         
@@ -80,6 +66,8 @@ class DocumentService:
             document_url: Döküman URL'si veya dosya yolu
             collection_name: İçeriği eklenecek koleksiyon adı
             document_type: Döküman tipi (şu an sadece 'pdf' desteklenir)
+            source: Tekrar yüklemelerde eşleştirme için kaynak adı (ör. orijinal dosya adı veya döküman kimliği)
+            progress: İlerleme bildirimi (pages_total, pages_parsed, chunks_total, chunks_embedded, chunks_inserted)
             
         Returns:
             Dict: İşlem sonucu
@@ -96,6 +84,8 @@ class DocumentService:
         else:
             # Yeni bir koleksiyon oluştur
             new_vector_collection = f"{collection_name}_collection"
+            if not is_valid_collection_name(new_vector_collection):
+                return {"success": False, "message": f"Geçersiz koleksiyon adı: {collection_name}", "document_count": 0}
             print(f"Yeni koleksiyon oluşturuluyor: {collection_name} -> {new_vector_collection}")
             
             # Koleksiyonu oluştur ve kaydet
@@ -104,7 +94,7 @@ class DocumentService:
         
         # Döküman tipine göre işleme yap - sadece pdf işleme var şu anda
         if document_type.lower() == "pdf":
-            return await self.pdf_processor.process_pdf(document_url, vector_collection)
+            return await self.pdf_processor.process_pdf(document_url, vector_collection, source, progress)
         else:
             return {
                 "success": False,
@@ -120,33 +110,8 @@ class DocumentService:
             Dict: Koleksiyon bilgileri
         """
         try:
-            # Milvus'a bağlan
-            connections.connect(
-                alias="default", 
-                host=self.milvus_host, 
-                port=self.milvus_port
-            )
-            
-            # Tüm koleksiyonları listele
-            db_collections = utility.list_collections()
-            
-            # Koleksiyon istatistiklerini al
-            collection_stats = []
-            for col_name in db_collections:
-                try:
-                    collection = Collection(name=col_name)
-                    collection.load()
-                    count = collection.num_entities
-                    collection_stats.append({
-                        "name": col_name,
-                        "count": count
-                    })
-                    collection.release()
-                except Exception as e:
-                    collection_stats.append({
-                        "name": col_name,
-                        "count": "Error: " + str(e)
-                    })
+            # Milvus çağrıları senkron olduğu için sınırlı iş parçacığı havuzunda çalıştırılır
+            collection_stats = await run_blocking(self._collect_collection_stats)
             
             # Tanımlı koleksiyonları ve gerçek koleksiyonları döndür
             return {
@@ -161,6 +126,37 @@ class DocumentService:
                 "error": str(e)
             }
     
+    def _collect_collection_stats(self) -> List[Dict[str, Any]]:
+        """
+        Milvus'taki tüm koleksiyonları ve kayıt sayılarını listeler
+        
+        Returns:
+            List[Dict]: Koleksiyon adı ve kayıt sayısı
+        """
+        # Milvus'a bağlan
+        self.milvus.connect()
+        
+        # Tüm koleksiyonları listele
+        db_collections = utility.list_collections()
+        
+        # Koleksiyon istatistiklerini al
+        collection_stats = []
+        for col_name in db_collections:
+            try:
+                # num_entities için koleksiyonu yüklemeye gerek yok
+                collection = self.milvus.get_collection(col_name, load=False)
+                count = collection.num_entities
+                collection_stats.append({
+                    "name": col_name,
+                    "count": count
+                })
+            except Exception as e:
+                collection_stats.append({
+                    "name": col_name,
+                    "count": "Error: " + str(e)
+                })
+        return collection_stats
+    
     async def clean_and_recreate_collection(self, collection_name: str) -> Dict[str, Any]:
         """
         Mevcut koleksiyonu temizler ve yeniden oluşturur
@@ -173,19 +169,17 @@ class DocumentService:
         """
         try:
             # Milvus'a bağlan
-            connections.connect(
-                alias="default", 
-                host=self.milvus_host, 
-                port=self.milvus_port
-            )
+            await run_blocking(self.milvus.connect)
             
             # Koleksiyon var mı kontrol et
-            if utility.has_collection(collection_name):
+            if await run_blocking(utility.has_collection, collection_name):
                 print(f"Koleksiyon siliniyor: {collection_name}")
-                utility.drop_collection(collection_name)
+                await run_blocking(utility.drop_collection, collection_name)
+                self.milvus.forget(collection_name)
+                await run_blocking(self.pdf_processor.manifest.forget_collection, collection_name)
             
             # Yeni koleksiyon oluştur
-            self.pdf_processor.ensure_collection_exists(collection_name)
+            await run_blocking(self.pdf_processor.ensure_collection_exists, collection_name)
             
             return {
                 "success": True,
@@ -227,10 +221,15 @@ class DocumentService:
             }
         
         vector_store_name = f"{collection_name}_collection"
+        if not is_valid_collection_name(vector_store_name):
+            return {
+                "success": False,
+                "message": "Geçersiz koleksiyon adı: yalnızca harf, rakam ve alt çizgi kullanılabilir, harf veya alt çizgiyle başlamalıdır"
+            }
         
         try:
             # Direct processor kullanarak koleksiyonu oluştur
-            if self.pdf_processor.ensure_collection_exists(vector_store_name):
+            if await run_blocking(self.pdf_processor.ensure_collection_exists, vector_store_name):
                 # Koleksiyonu tanım listesine ekle
                 self.collections[collection_name] = vector_store_name
                 
@@ -273,22 +272,21 @@ class DocumentService:
         
         try:
             # Milvus'a bağlan
-            connections.connect(
-                alias="default", 
-                host=self.milvus_host, 
-                port=self.milvus_port
-            )
+            await run_blocking(self.milvus.connect)
             
             # Koleksiyon var mı kontrol et
-            if not utility.has_collection(vector_store_name):
+            if not await run_blocking(utility.has_collection, vector_store_name):
                 del self.collections[collection_name]
+                await run_blocking(self.pdf_processor.manifest.forget_collection, vector_store_name)
                 return {
                     "success": True,
                     "message": f"'{collection_name}' koleksiyonu tanımı silindi (vector store zaten yoktu)"
                 }
             
             # Koleksiyonu sil
-            utility.drop_collection(vector_store_name)
+            await run_blocking(utility.drop_collection, vector_store_name)
+            self.milvus.forget(vector_store_name)
+            await run_blocking(self.pdf_processor.manifest.forget_collection, vector_store_name)
             
             # Koleksiyonu tanım listesinden çıkar
             del self.collections[collection_name]
@@ -307,11 +305,25 @@ class DirectMilvusPDFProcessor:
     """
     Langchain Milvus entegrasyonunu atlamak için doğrudan Milvus API'sini kullanarak PDF dosyalarını işler
     """
-    def __init__(self, openai_api_key: str, milvus_host: str = "localhost", milvus_port: str = "19530"):
+    def __init__(self, openai_api_key: str, milvus_host: str = "localhost", milvus_port: str = "19530", ingestion_config: Optional[Dict[str, Any]] = None, extraction_config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            openai_api_key: OpenAI API anahtarı
+            milvus_host: Milvus sunucu adresi
+            milvus_port: Milvus sunucu portu
+            ingestion_config: EmbeddingPipeline ayarları (max_batch_tokens, max_in_flight, max_retries, ...)
+                ve manifest_path (yüklenen parçaların parmak izlerinin tutulduğu SQLite dosyası)
+            extraction_config: ParallelPDFExtractor ayarları (max_workers, pages_per_shard)
+        """
         self.openai_api_key = openai_api_key
         self.milvus_host = milvus_host
         self.milvus_port = milvus_port
-        self.embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key)
+        # Döküman parçaları sorgu önbelleğini doldurmasın diye ayrı isim alanı kullanılır
+        self.embeddings = get_shared_embeddings(openai_api_key, namespace="documents")
+        ingestion_config = dict(ingestion_config or {})
+        self.manifest = IngestionManifest(ingestion_config.pop("manifest_path", None) or "documents/ingestion_manifest.sqlite")
+        self.pipeline = EmbeddingPipeline(self.embeddings, **ingestion_config)
+        self.extractor = ParallelPDFExtractor(**(extraction_config or {}))
         
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -319,15 +331,12 @@ class DirectMilvusPDFProcessor:
             separators=["\n\n", "\n", " ", ""]
         )
         
+        self.milvus = get_milvus_manager(milvus_host, milvus_port)
         self._connect_to_milvus()
     
     def _connect_to_milvus(self):
         try:
-            connections.connect(
-                alias="default", 
-                host=self.milvus_host, 
-                port=self.milvus_port
-            )
+            self.milvus.connect()
             print(f"Milvus bağlantısı başarılı: {self.milvus_host}:{self.milvus_port}")
         except Exception as e:
             print(f"Milvus bağlantı hatası: {str(e)}")
@@ -341,7 +350,7 @@ class DirectMilvusPDFProcessor:
             if not utility.has_collection(collection_name):
                 return None
                 
-            collection = Collection(name=collection_name)
+            collection = self.milvus.get_collection(collection_name, load=False)
             schema = collection.schema
             return schema
         except Exception as e:
@@ -393,13 +402,17 @@ class DirectMilvusPDFProcessor:
             print(f"Koleksiyon oluşturma hatası: {str(e)}")
             return False
     
-    async def process_pdf(self, file_path: str, collection_name: str) -> Dict[str, Any]:
+    async def process_pdf(self, file_path: str, collection_name: str, source: Optional[str] = None, progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
         """
         PDF dosyasını okur, parçalara böler, embeddings oluşturur ve Milvus'a ekler
         
+        Aynı kaynak tekrar yüklendiğinde yalnızca yeni veya değişen parçalar embed edilir.
+        
         Args:
             file_path: PDF dosya yolu
             collection_name: Milvus koleksiyon adı
+            source: Manifest ve metadata için kaynak adı (verilmezse dosya yolu)
+            progress: İlerleme bildirimi (pages_total, pages_parsed, chunks_total, chunks_embedded, chunks_inserted)
             
         Returns:
             Dict: İşlem sonucu
@@ -411,183 +424,238 @@ class DirectMilvusPDFProcessor:
             
             print(f"PDF işleniyor: {file_path} -> {collection_name}")
             
+            # Sayfalar süreç havuzunda okunur, biten her sayfa hemen parçalanıp
+            # embedding boru hattına verilir; embedding okuma bitmeden başlar
+            timings = []
+            
+            async def page_chunks():
+                async for page in self.extractor.stream_pages(file_path, timings=timings):
+                    if progress:
+                        progress(pages_total=page["total_pages"], pages_parsed=len(timings))
+                    if page["text"]:
+                        # Sayfalar tamamlanma sırasıyla geldiği için index sayfa içindeki sıradır
+                        yield [(page_no, index, chunk) for index, (page_no, chunk) in enumerate(self._split_pages([(page["page"], page["text"])]))]
+            
+            result = await self._ingest_stream(page_chunks(), collection_name, source=source or file_path, progress=progress)
+            
+            extraction = ParallelPDFExtractor.summarize(timings)
+            print(f"PDF'den {extraction['pages']} sayfa okundu ({extraction.get('pdfminer_pages', 0)} PDFMiner, {extraction.get('failed_pages', 0)} hatalı)")
+            
+            if result.get("empty"):
+                return {"success": False, "message": "PDF'den metin çıkarılamadı", "document_count": 0, "extraction": extraction}
+            result["extraction"] = extraction
+            return result
+        
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"PDF işleme genel hatası:\n{error_trace}")
+            return {"success": False, "message": f"PDF işleme hatası: {str(e)}", "document_count": 0}
+    
+    async def process_texts(self, pages: List[Tuple[Optional[int], str]], collection_name: str, source: str) -> Dict[str, Any]:
+        """
+        Önceden çıkarılmış sayfa metinlerini parçalara böler, embeddings oluşturur ve Milvus'a ekler
+        
+        Args:
+            pages: (sayfa numarası, metin) listesi, sayfa numarası bilinmiyorsa None
+            collection_name: Milvus koleksiyon adı
+            source: Metadata'ya yazılacak kaynak adı
+            
+        Returns:
+            Dict: İşlem sonucu
+        """
+        # Sayfaları parçala (sayfa numarası her parçanın metadata'sında korunur)
+        text_chunks = await run_blocking(self._split_pages, pages)
+        return await self._ingest_chunks(text_chunks, collection_name, source)
+    
+    async def _ingest_chunks(self, text_chunks: List[Tuple[Optional[int], str]], collection_name: str, source: str, progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """
+        Parçalanmış metinleri embed eder ve Milvus'a ekler
+        
+        Args:
+            text_chunks: (sayfa numarası, parça metni) listesi
+            collection_name: Milvus koleksiyon adı
+            source: Metadata'ya yazılacak kaynak adı
+            progress: İlerleme bildirimi (chunks_total, chunks_embedded, chunks_inserted)
+            
+        Returns:
+            Dict: İşlem sonucu
+        """
+        async def single_group():
+            yield [(page_no, chunk_idx, chunk) for chunk_idx, (page_no, chunk) in enumerate(text_chunks)]
+        
+        result = await self._ingest_stream(single_group(), collection_name, source, progress)
+        if result.pop("empty", False):
+            return {"success": False, "message": "İşlenecek metin bulunamadı", "document_count": 0}
+        return result
+    
+    async def _ingest_stream(self, groups: AsyncIterator[List[Tuple[Optional[int], int, str]]], collection_name: str, source: str, progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """
+        Parça grupları geldikçe embed eder ve Milvus'a ekler
+        
+        Değişmeyen parçalar (manifest'te kayıtlı) atlanır. Kaynaktan artık gelmeyen eski
+        parçalar ancak tüm gruplar okunduktan sonra silinir; hiç parça gelmezse
+        (empty=True döner) mevcut parçalara dokunulmaz.
+        
+        Args:
+            groups: (sayfa numarası, parça sırası, parça metni) listeleri üreten async iterator
+            collection_name: Milvus koleksiyon adı
+            source: Metadata'ya yazılacak kaynak adı
+            progress: İlerleme bildirimi (chunks_total, chunks_embedded, chunks_inserted)
+            
+        Returns:
+            Dict: İşlem sonucu
+        """
+        try:
             # Koleksiyon varlığını kontrol et
-            if not self.ensure_collection_exists(collection_name):
+            if not await run_blocking(self.ensure_collection_exists, collection_name):
                 return {"success": False, "message": f"Koleksiyon oluşturulamadı: {collection_name}", "document_count": 0}
             
             # Koleksiyon şemasını al
-            schema = self.get_collection_schema(collection_name)
+            schema = await run_blocking(self.get_collection_schema, collection_name)
             if not schema:
                 return {"success": False, "message": f"Koleksiyon şeması alınamadı: {collection_name}", "document_count": 0}
             
             # Metadata alanının tipini öğren
-            metadata_field = None
             field_type = None
             for field in schema.fields:
                 if field.name == "metadata":
-                    metadata_field = field
                     field_type = field.dtype
                     break
             
             print(f"Metadata alanı tipi: {field_type}")
             
-            # Text parçalarını çıkar
-            text_chunks = self._extract_text_from_pdf(file_path)
-            
-            if not text_chunks:
-                return {"success": False, "message": "PDF'den metin çıkarılamadı", "document_count": 0}
-            
-            print(f"PDF'den {len(text_chunks)} metin parçası çıkarıldı")
-            
-            # Her bir text parçası için embeddings oluştur
-            successful_chunks = 0
-            
             # Koleksiyonu al
-            collection = Collection(name=collection_name)
-            
-            # Toplu veri hazırla
-            entity_ids = []
-            texts = []
-            metadatas = []
-            embeddings_list = []
-            
-            batch_size = 10
-            for i in range(0, len(text_chunks), batch_size):
-                batch_chunks = text_chunks[i:i+batch_size]
-                
-                try:
-                    # Her birisi için embedding oluştur
-                    for idx, chunk in enumerate(batch_chunks):
-                        chunk_idx = i + idx
-                        
+            collection = await run_blocking(self.milvus.get_collection, collection_name, load=False)
+            
+            # Manifest ile karşılaştırılır: değişmeyenler atlanır, kaybolanlar en sonda silinir
+            existing = await run_blocking(self.manifest.get, collection_name, source)
+            seen = set()
+            fingerprints = {}
+            counts = {"chunks": 0, "new": 0}
+            
+            async def new_chunks():
+                async for group in groups:
+                    entity_ids = []
+                    texts = []
+                    metadatas = []
+                    for page_no, chunk_idx, chunk in group:
+                        counts["chunks"] += 1
                         # Boş veya çok kısa metinleri atla
                         if not chunk or len(chunk.strip()) < 20:
-                            print(f"Parça {chunk_idx+1} çok kısa, atlanıyor")
+                            print(f"Parça {chunk_idx+1} (sayfa {page_no}) çok kısa, atlanıyor")
+                            continue
+                        fingerprint = chunk_fingerprint(chunk, self.embeddings.model_name)
+                        # Aynı kaynakta tekrar eden parçalar bir kez eklenir
+                        if fingerprint in seen:
+                            continue
+                        seen.add(fingerprint)
+                        if fingerprint in existing:
                             continue
                         
-                        # Verileri hazırla
-                        doc_id = f"{collection_name}_{uuid.uuid4()}"
+                        entity_id = chunk_entity_id(source, fingerprint)
+                        fingerprints[entity_id] = fingerprint
                         
                         # Metadata tipine göre uygun şekilde ekle
                         if field_type == DataType.JSON:
                             metadata = {
-                                "source": file_path,
-                                "index": chunk_idx
+                                "source": source,
+                                "page": page_no,
+                                "index": chunk_idx,
+                                "fingerprint": fingerprint
                             }
                         else:
-                            metadata = f"source: {file_path}, index: {chunk_idx}"
+                            metadata = f"source: {source}, page: {page_no}, index: {chunk_idx}, fingerprint: {fingerprint}"
                         
-                        entity_ids.append(doc_id)
+                        entity_ids.append(entity_id)
                         texts.append(chunk)
                         metadatas.append(metadata)
                     
-                    # Tüm batch için bir kerede embeddings oluştur
-                    if texts:
-                        print(f"Batch embeddings oluşturuluyor ({len(texts)} parça)...")
-                        batch_embeddings = await self._get_embeddings_async(texts)
-                        embeddings_list.extend(batch_embeddings)
-                        
-                        if entity_ids and texts and metadatas and embeddings_list:
-                            print(f"Milvus'a {len(entity_ids)} parça ekleniyor...")
-                            
-                            entities = [
-                                entity_ids,
-                                texts,
-                                metadatas,
-                                embeddings_list
-                            ]
-                            
-                            # Veriyi koleksiyona ekle
-                            insert_result = collection.insert(entities)
-                            successful_chunks += len(entity_ids)
-                            
-                            print(f"Batch ekleme başarılı: {insert_result}")
-                            
-                        # Listeleri temizle
-                        entity_ids = []
-                        texts = []
-                        metadatas = []
-                        embeddings_list = []
-                
-                except Exception as batch_error:
-                    print(f"Batch işleme hatası: {str(batch_error)}")
+                    if entity_ids:
+                        counts["new"] += len(entity_ids)
+                        # Kaldığı yerden devam eden işlerde önceden eklenmiş parçalar burada sayılmaz
+                        if progress:
+                            progress(chunks_total=counts["new"])
+                        yield entity_ids, texts, metadatas
+            
+            def insert_batch(ids, batch_texts, batch_metadatas, vectors):
+                result = collection.insert([ids, batch_texts, batch_metadatas, vectors])
+                # Manifest yalnızca başarılı eklemeden sonra güncellenir
+                self.manifest.add(collection_name, source, {fingerprints[entity_id]: entity_id for entity_id in ids})
+                return result
+            
+            # Token bütçeli batch'ler eşzamanlı embed edilir, ekleme ayrı aşamada yapılır
+            stats = await self.pipeline.run_stream(new_chunks(), insert_batch, progress)
+            
+            if not seen:
+                return {"success": False, "message": "İşlenecek metin bulunamadı", "document_count": 0, "empty": True}
+            
+            print(f"{source} kaynağından {counts['chunks']} metin parçası oluşturuldu")
+            
+            stale = {fingerprint: entity_id for fingerprint, entity_id in existing.items() if fingerprint not in seen}
+            removed = 0
+            if stale:
+                await run_blocking(self._delete_entities, collection, list(stale.values()))
+                await run_blocking(self.manifest.remove, collection_name, source, stale.keys())
+                removed = len(stale)
+            
+            stats["skipped"] = len(seen) - counts["new"]
+            stats["added"] = stats["inserted"]
+            stats["removed"] = removed
+            successful_chunks = stats["inserted"]
+            print(f"Ingestion tamamlandı: {collection_name} - {stats}")
             
             # Sonuçları bildir
-            if successful_chunks > 0:
+            if stats["failed"] == 0:
                 return {
                     "success": True,
-                    "message": f"PDF başarıyla işlendi: {successful_chunks} metin parçası eklendi",
-                    "document_count": successful_chunks
+                    "message": f"Metin başarıyla işlendi: {stats['added']} parça eklendi, {stats['skipped']} değişmeyen parça atlandı, {stats['removed']} eski parça silindi",
+                    "document_count": successful_chunks,
+                    "stats": stats
                 }
             else:
                 return {
-                    "success": False,
-                    "message": "PDF işlendi ancak hiç metin parçası eklenemedi",
-                    "document_count": 0
+                    "success": successful_chunks > 0,
+                    "message": f"Metin kısmen işlendi: {stats['added']} parça eklendi, {stats['failed']} parça eklenemedi",
+                    "document_count": successful_chunks,
+                    "stats": stats
                 }
         
         except Exception as e:
             import traceback
             error_trace = traceback.format_exc()
-            print(f"PDF işleme genel hatası:\n{error_trace}")
-            return {"success": False, "message": f"PDF işleme hatası: {str(e)}", "document_count": 0}
-
-    def create_temp_pdf_from_text(self, text: str) -> str:
+            print(f"Metin işleme genel hatası:\n{error_trace}")
+            return {"success": False, "message": f"Metin işleme hatası: {str(e)}", "document_count": 0}
+        
+    async def process_pdf_by_page_lists(self, file_path: str, sections: Dict[str, List[int]], document_id: Optional[str] = None) -> Dict[str, Any]:
         """
-        Creates a temporary PDF file containing the provided text.
+        PDF'i bir kez okur ve verilen sayfa listelerine göre her bölümü kendi koleksiyonuna ekler
         
-        Args:
-            text: The text content to include in the PDF.
+        Aynı döküman (kimlik verilmezse aynı dosya yolu) tekrar işlendiğinde yalnızca
+        değişen parçalar embed edilir, kaybolanlar silinir.
         
+        Args:
+            file_path: PDF dosya yolu
+            sections: Koleksiyon adı -> sayfa numaraları (1'den başlar)
+            document_id: Tekrar yüklemelerde eşleştirme için döküman kimliği (verilmezse dosya yolu)
+            
         Returns:
-            The file path of the created temporary PDF.
+            Dict: Bölüm bazında işlem sonuçları
         """
-        # Create a temporary file with a .pdf suffix (it won't be auto-deleted)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            output_path = tmp.name
-
-        # Create a canvas for the PDF using the letter page size
-        c = canvas.Canvas(output_path, pagesize=letter)
-        width, height = letter
-        margin = 40
-        x = margin
-        y = height - margin
-        line_height = 14  # Adjust this value to change line spacing
-
-        # Split the text into lines and write them to the PDF
-        for line in text.split("\n"):
-            c.drawString(x, y, line)
-            y -= line_height
-            # If we reach the bottom margin, start a new page
-            if y < margin:
-                c.showPage()
-                y = height - margin
-
-        # Finalize the PDF file
-        c.save()
-        return output_path
-        
-    async def process_pdf_by_page_lists(self, file_path: str) -> Dict[str, Any]:
         if not os.path.exists(file_path):
             return {"success": False, "message": f"Dosya bulunamadı: {file_path}"}
 
-        print(f"PDF işleniyor (sayfa listeleri ile bölümlere ayrılacak): {file_path}")
+        invalid = [section for section in sections if not is_valid_collection_name(section)]
+        if invalid:
+            return {"success": False, "message": f"Geçersiz koleksiyon adları: {', '.join(invalid)}"}
 
-        try:
-            from pypdf import PdfReader
-        except ImportError:
-            return {"success": False, "message": "pypdf modülü yüklü değil."}
+        source = document_id or file_path
 
-        reader = PdfReader(file_path)
-        total_pages = len(reader.pages)
-        print(f"Toplam sayfa: {total_pages}")
+        print(f"PDF işleniyor (sayfa listeleri ile bölümlere ayrılacak): {file_path}")
 
-        # 🔁 Define your custom page lists here
-        sections = {
-            "rehberlik": [6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21],
-            "öneri": list(range(21, 50)),  # Fill this later
-            "motivasyon": []  # Fill this later
-        }
+        # Yalnızca bölümlerde geçen sayfalar okunur
+        requested_pages = {p for page_list in sections.values() for p in page_list}
+        page_texts = {page_no: text for page_no, text in (await self.extractor.extract_pages(file_path, requested_pages)).items() if text}
 
         results = {}
 
@@ -596,37 +664,16 @@ class DirectMilvusPDFProcessor:
                 results[section] = {"success": False, "message": "Sayfa listesi tanımlanmadı."}
                 continue
 
-            # Filter invalid pages
-            valid_pages = [p for p in page_list if 1 <= p <= total_pages]
-            if not valid_pages:
-                results[section] = {"success": False, "message": f"{section} için geçerli sayfa bulunamadı."}
-                continue
-
-            print(f"{section} bölümü için sayfalar: {valid_pages}")
-
-            # Read and collect text
-            text_chunks = []
-            for p in valid_pages:
-                try:
-                    text = reader.pages[p - 1].extract_text()
-                    if text and text.strip():
-                        text_chunks.append(text.strip())
-                except Exception as e:
-                    print(f"Sayfa {p} okunamadı: {str(e)}")
+            print(f"{section} bölümü için sayfalar: {page_list}")
 
-            if not text_chunks:
+            # Geçersiz ve boş sayfalar extract_pages sonucunda yer almaz
+            section_pages = [(p, page_texts[p]) for p in page_list if p in page_texts]
+            if not section_pages:
                 results[section] = {"success": False, "message": f"{section} metni boş"}
                 continue
 
-            # Write to temporary file
-            section_text = "\n\n".join(text_chunks)
-            temp_path = self.create_temp_pdf_from_text(section_text)
-
-            # Process as PDF
-            result = await self.process_pdf(temp_path, section)
-            results[section] = result
-
-            os.remove(temp_path)
+            # Metin doğrudan parçalama ve embedding aşamasına gider
+            results[section] = await self.process_texts(section_pages, section, source=source)
 
         return {
             "success": True,
@@ -634,76 +681,29 @@ class DirectMilvusPDFProcessor:
             "results": results
         }
     
-    def _extract_text_from_pdf(self, file_path: str) -> List[str]:
+    @staticmethod
+    def _delete_entities(collection: Collection, entity_ids: List[str], batch_size: int = 500) -> None:
         """
-        PDF'den metin çıkarır
-        
-        Args:
-            file_path: PDF dosya yolu
-            
-        Returns:
-            List[str]: Metin parçaları
+        Verilen kimliklere sahip parçaları koleksiyondan siler
         """
-        text_chunks = []
-        
-        # İlk yöntem: PyPDF
-        try:
-            from pypdf import PdfReader
-            reader = PdfReader(file_path)
-            
-            for i, page in enumerate(reader.pages):
-                try:
-                    text = page.extract_text()
-                    if text and text.strip():
-                        cleaned_text = text.strip()
-                        text_chunks.append(cleaned_text)
-                except Exception as e:
-                    print(f"Sayfa {i+1} okuma hatası: {str(e)}")
-        
-        except Exception as e:
-            print(f"PyPDF okuma hatası: {str(e)}")
-            
-            # İkinci yöntem: PDFMiner
-            try:
-                from pdfminer.high_level import extract_text
-                text = extract_text(file_path)
-                
-                if text:
-                    paragraphs = text.split('\n\n')
-                    for para in paragraphs:
-                        if para.strip():
-                            text_chunks.append(para.strip())
-            except Exception as pdf_miner_error:
-                print(f"PDFMiner okuma hatası: {str(pdf_miner_error)}")
-        
-        if text_chunks:
-            try:
-                # Önce document formatına dönüştür
-                documents = [Document(page_content=chunk) for chunk in text_chunks]
-                # Parçala
-                split_docs = self.text_splitter.split_documents(documents)
-                # Metin olarak geri al
-                return [doc.page_content for doc in split_docs]
-            except Exception as split_error:
-                print(f"Metin parçalama hatası: {str(split_error)}")
-                return text_chunks
-        else:
-            return []
+        for i in range(0, len(entity_ids), batch_size):
+            ids = ", ".join(f'"{entity_id}"' for entity_id in entity_ids[i:i + batch_size])
+            collection.delete(expr=f"id in [{ids}]")
     
-    async def _get_embeddings_async(self, texts: List[str]) -> List[List[float]]:
+    def _split_pages(self, pages: List[Tuple[Optional[int], str]]) -> List[Tuple[Optional[int], str]]:
         """
-        Metinler için eşzamanlı embeddings oluşturur
+        Sayfa metinlerini parçalara böler
         
         Args:
-            texts: Metin listesi
+            pages: (sayfa numarası, metin) listesi
             
         Returns:
-            List[List[float]]: Embeddings listesi
+            List[Tuple]: (sayfa numarası, parça metni) listesi
         """
+        documents = [Document(page_content=text, metadata={"page": page_no}) for page_no, text in pages if text and text.strip()]
         try:
-            # OpenAI embeddings
-            embeddings = await self.embeddings.aembed_documents(texts)
-            return embeddings
-        except Exception as e:
-            print(f"Embeddings oluşturma hatası: {str(e)}")
-            return [[0.0] * 1536 for _ in range(len(texts))]
\ No newline at end of file
+            split_docs = self.text_splitter.split_documents(documents)
+            return [(doc.metadata.get("page"), doc.page_content) for doc in split_docs]
+        except Exception as split_error:
+            print(f"Metin parçalama hatası: {str(split_error)}")
+            return [(doc.metadata.get("page"), doc.page_content) for doc in documents]
@@ -0,0 +1,272 @@
+# embedding_cache.py
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+from langchain_core.embeddings import Embeddings
+from langchain.embeddings import OpenAIEmbeddings
+from modules.executor import run_blocking
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Disk isabetlerinin last_used güncellemeleri bu sayıya ulaşınca (veya bir sonraki yazmada) topluca yazılır
+TOUCH_BATCH_SIZE = 100
+
+
+def normalize_text(text: str) -> str:
+    """
+    Önbellek anahtarı için metni normalize eder (Unicode NFC ve boşluk sadeleştirme)
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embedding modelini bellek içi LRU ve opsiyonel SQLite disk katmanıyla saran önbellek
+
+    Vektörler bellekte float32 dizisi olarak tutulur (1536 boyutta ~6 KB), dışarıya liste olarak verilir.
+    """
+    def __init__(self, base: Embeddings, model_name: Optional[str] = None, max_entries: int = 10000, disk_path: Optional[str] = None, max_disk_entries: int = 100000):
+        """
+        Args:
+            base: Asıl embedding modeli (ör. OpenAIEmbeddings)
+            model_name: Anahtara eklenecek model adı (verilmezse base.model kullanılır)
+            max_entries: Bellekte tutulacak en fazla vektör sayısı (0 ise bellek katmanı kapalı)
+            disk_path: Yeniden başlatmalarda korunacak SQLite dosyası (None ise disk katmanı kapalı)
+            max_disk_entries: Diskte tutulacak en fazla vektör; aşılınca en uzun süredir kullanılmayanlar silinir
+        """
+        self.base = base
+        self.model_name = model_name or getattr(base, "model", base.__class__.__name__)
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._disk = None
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL DEFAULT 0)")
+            # last_used sütunu sonradan eklendi, eski önbellek dosyaları için
+            columns = {row[1] for row in self._disk.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in columns:
+                self._disk.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self._disk.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._disk.commit()
+            self._disk_count = self._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._evict_disk()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector.tolist()
+            self.memory_hits += len(found)
+
+            missing = [key for key in keys if key not in found]
+            if self._disk is not None and missing:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._disk.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", missing
+                ).fetchall()
+                now = time.time()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector.tolist()
+                    self._remember(key, vector)
+                    self._touched[key] = now
+                self.disk_hits += len(rows)
+                if len(self._touched) >= TOUCH_BATCH_SIZE:
+                    self._flush_touched()
+                    self._disk.commit()
+        return found
+
+    def _remember(self, key: str, vector) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = np.asarray(vector, dtype=np.float32)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self) -> None:
+        """
+        Biriken last_used güncellemelerini yazar (kilit altında çağrılır, commit çağırana aittir)
+        """
+        if self._touched:
+            self._disk.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _store(self, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._disk is not None and items:
+                # Eviction'dan önce son kullanımlar yazılır ki yeni okunan vektörler silinmesin
+                self._flush_touched()
+                now = time.time()
+                before = self._disk.total_changes
+                self._disk.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+                )
+                self._disk_count += self._disk.total_changes - before
+                self._evict_disk()
+                self._disk.commit()
+
+    def _evict_disk(self) -> None:
+        """
+        Disk katmanı sınırı aştıysa en uzun süredir kullanılmayan vektörleri siler (kilit altında çağrılır)
+        """
+        excess = self._disk_count - self.max_disk_entries
+        if excess <= 0:
+            return
+        self._disk.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self._disk.commit()
+        self._disk_count = self._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _split(self, texts: List[str]):
+        keys = [self._key(text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        # Aynı çağrıdaki tekrar eden metinler yalnızca bir kez embed edilir
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        with self._lock:
+            self.misses += len(missing)
+        return keys, found, missing
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._split(texts)
+        if missing:
+            vectors = self.base.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, missing = self._split([text])
+        if missing:
+            vector = self.base.embed_query(text)
+            self._store({keys[0]: vector})
+            return vector
+        return found[keys[0]]
+
+    async def _asplit(self, texts: List[str]):
+        # SQLite okuma/yazma event loop'u bloklamasın diye disk katmanı varsa havuzda çalışır
+        if self._disk is None:
+            return self._split(texts)
+        return await run_blocking(self._split, texts)
+
+    async def _astore(self, items: Dict[str, List[float]]) -> None:
+        if self._disk is None:
+            self._store(items)
+        else:
+            await run_blocking(self._store, items)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = await self._asplit(texts)
+        if missing:
+            vectors = await self.base.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            await self._astore(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, missing = await self._asplit([text])
+        if missing:
+            vector = await self.base.aembed_query(text)
+            await self._astore({keys[0]: vector})
+            return vector
+        return found[keys[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_enabled": self._disk is not None,
+                "disk_entries": self._disk_count if self._disk is not None else 0,
+                "max_disk_entries": self.max_disk_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / total, 4) if total else None
+            }
+
+
+# Süreç genelinde paylaşılan önbellekler ("query": sorgular, "documents": döküman yükleme,
+# "sentences": cümle bazlı sıkıştırma)
+# Disk katmanı yalnızca tekrar eden sorgular için tutulur; döküman ve cümle vektörleri tek seferliktir
+DISK_NAMESPACES = {"query"}
+# İsim alanı başına bellek sınırının ortam değişkeni ve varsayılanı. Döküman vektörleri bir
+# daha sorulmadığı için (değişmeyen parçaları manifest atlar) bellekte tutulmaz
+NAMESPACE_SIZES = {
+    "query": ("EMBEDDING_CACHE_SIZE", "10000"),
+    "sentences": ("EMBEDDING_CACHE_SENTENCE_SIZE", "2000"),
+    "documents": ("EMBEDDING_CACHE_DOCUMENT_SIZE", "0"),
+}
+_shared_embeddings: Dict[str, CachedEmbeddings] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_embeddings(openai_api_key: str, namespace: str = "query") -> CachedEmbeddings:
+    """
+    Verilen isim alanı için paylaşılan önbellekli OpenAI embedding modelini döndürür
+
+    Bellek sınırları NAMESPACE_SIZES'taki ortam değişkenlerinden, disk yolu ve sınırı
+    EMBEDDING_CACHE_PATH ve EMBEDDING_CACHE_DISK_SIZE'dan okunur. Her isim alanının kendi bellek
+    katmanı vardır; disk katmanı yalnızca DISK_NAMESPACES içindeki isim alanları için açılır.
+
+    Args:
+        openai_api_key: OpenAI API anahtarı
+        namespace: Bellek katmanı isim alanı
+
+    Returns:
+        CachedEmbeddings: Paylaşılan önbellekli model
+    """
+    with _shared_lock:
+        if namespace not in _shared_embeddings:
+            size_env, size_default = NAMESPACE_SIZES.get(namespace, NAMESPACE_SIZES["query"])
+            _shared_embeddings[namespace] = CachedEmbeddings(
+                OpenAIEmbeddings(openai_api_key=openai_api_key),
+                max_entries=int(os.getenv(size_env, size_default)),
+                disk_path=(os.getenv("EMBEDDING_CACHE_PATH") or None) if namespace in DISK_NAMESPACES else None,
+                max_disk_entries=int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "100000"))
+            )
+        return _shared_embeddings[namespace]
+
+
+def embedding_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Tüm paylaşılan önbelleklerin hit/miss sayaçlarını döndürür
+    """
+    with _shared_lock:
+        return {namespace: cache.stats() for namespace, cache in _shared_embeddings.items()}
@@ -0,0 +1,70 @@
+# executor.py
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Event loop'u bloklayan senkron SDK çağrıları (Milvus, PDF okuma vb.) için sınırlı iş parçacığı havuzu
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_max_workers = 16
+
+_in_flight = 0
+_completed = 0
+
+
+def configure_blocking_pool(max_workers: int) -> None:
+    """
+    Havuz boyutunu ayarlar (havuz ilk kullanımdan önce çağrılmalıdır)
+    """
+    global _max_workers
+    with _executor_lock:
+        if _executor is not None:
+            raise RuntimeError("Blocking havuzu zaten başlatıldı, boyutu değiştirilemez")
+        _max_workers = max_workers
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="blocking")
+        return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Senkron bir fonksiyonu sınırlı havuzda çalıştırır ve sonucunu bekler
+
+    Args:
+        func: Çağrılacak senkron fonksiyon
+        *args, **kwargs: Fonksiyon argümanları
+
+    Returns:
+        Any: Fonksiyonun dönüş değeri
+    """
+    global _in_flight, _completed
+    loop = asyncio.get_running_loop()
+    _in_flight += 1
+    try:
+        return await loop.run_in_executor(get_blocking_executor(), functools.partial(func, *args, **kwargs))
+    finally:
+        _in_flight -= 1
+        _completed += 1
+
+
+def blocking_pool_stats() -> Dict[str, Any]:
+    return {
+        "max_workers": _max_workers,
+        "in_flight": _in_flight,
+        "completed": _completed
+    }
+
+
+def shutdown_blocking_pool() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
@@ -0,0 +1,342 @@
+# ingestion.py
+import os
+import re
+import time
+import random
+import sqlite3
+import hashlib
+import asyncio
+import threading
+from typing import List, Dict, Any, Callable, Optional, Iterable, AsyncIterable, Tuple
+from langchain_core.embeddings import Embeddings
+from modules.executor import run_blocking
+from modules.embedding_cache import normalize_text
+
+# OpenAI embedding isteği başına sınırlar (tek girdi 8191 token, istek başına 2048 girdi)
+MAX_INPUT_TOKENS = 8191
+MAX_BATCH_INPUTS = 2048
+
+# Milvus koleksiyon adı kuralı: harf veya alt çizgiyle başlar, yalnızca harf, rakam ve alt çizgi, en fazla 255 karakter
+COLLECTION_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,254}$")
+
+
+class TokenCounter:
+    """
+    Embedding modelinin tokenizer'ı ile token sayar, tiktoken yoksa karakter sayısından tahmin eder
+    """
+    def __init__(self, model_name: str = "text-embedding-ada-002"):
+        try:
+            import tiktoken
+            try:
+                self._encoding = tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            self._encoding = None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        # Türkçe metinlerde token başına ortalama ~2-3 karakter düşer, temkinli tahmin yapılır
+        return len(text) // 2 + 1
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    if error.__class__.__name__ == "RateLimitError" or getattr(error, "status_code", None) == 429:
+        return True
+    return "rate limit" in str(error).lower()
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def chunk_fingerprint(text: str, model_name: str) -> str:
+    """
+    Parçanın normalize edilmiş metni ve embedding modelinden türetilen parmak izi
+
+    Model değişirse aynı metin yeniden embed edilir.
+    """
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def is_valid_collection_name(name: str) -> bool:
+    """
+    Adın Milvus koleksiyon adı kurallarına uyup uymadığını döndürür
+    """
+    return isinstance(name, str) and COLLECTION_NAME_PATTERN.match(name) is not None
+
+
+def chunk_entity_id(source: str, fingerprint: str) -> str:
+    """
+    Kaynak ve parmak izinden deterministik Milvus kimliği üretir (64 karakter)
+    """
+    return hashlib.sha256(f"{source}\0{fingerprint}".encode("utf-8")).hexdigest()
+
+
+class IngestionManifest:
+    """
+    (koleksiyon, kaynak) başına Milvus'a eklenmiş parça parmak izlerini tutan SQLite manifest'i
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite dosya yolu
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "collection TEXT NOT NULL, source TEXT NOT NULL, fingerprint TEXT NOT NULL, entity_id TEXT NOT NULL, "
+            "PRIMARY KEY (collection, source, fingerprint))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, collection: str, source: str) -> Dict[str, str]:
+        """
+        Kaynağın kayıtlı parçalarını döndürür
+
+        Returns:
+            Dict[str, str]: parmak izi -> Milvus kimliği
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fingerprint, entity_id FROM chunks WHERE collection = ? AND source = ?",
+                (collection, source)
+            ).fetchall()
+        return dict(rows)
+
+    def add(self, collection: str, source: str, entries: Dict[str, str]) -> None:
+        """
+        Milvus'a eklenen parçaları kaydeder (parmak izi -> Milvus kimliği)
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (collection, source, fingerprint, entity_id) VALUES (?, ?, ?, ?)",
+                [(collection, source, fingerprint, entity_id) for fingerprint, entity_id in entries.items()]
+            )
+            self._conn.commit()
+
+    def remove(self, collection: str, source: str, fingerprints: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE collection = ? AND source = ? AND fingerprint = ?",
+                [(collection, source, fingerprint) for fingerprint in fingerprints]
+            )
+            self._conn.commit()
+
+    def forget_collection(self, collection: str) -> None:
+        """
+        Silinen veya yeniden oluşturulan koleksiyonun tüm kayıtlarını bırakır
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE collection = ?", (collection,))
+            self._conn.commit()
+
+
+class EmbeddingPipeline:
+    """
+    Metin parçalarını token bütçeli batch'lere bölerek eşzamanlı embed eden
+    ve Milvus eklemesini ayrı bir aşamada yapan boru hattı
+    """
+    def __init__(self,
+                 embeddings: Embeddings,
+                 max_batch_tokens: int = 100000,
+                 max_in_flight: int = 4,
+                 max_retries: int = 5,
+                 base_delay: float = 1.0,
+                 insert_queue_size: int = 4):
+        """
+        Args:
+            embeddings: Embedding modeli (aembed_documents destekli)
+            max_batch_tokens: Bir embedding isteğindeki toplam token bütçesi
+            max_in_flight: Aynı anda beklenen en fazla embedding isteği
+            max_retries: Rate limit ve geçici hatalarda en fazla tekrar sayısı
+            base_delay: Üstel geri çekilmenin başlangıç süresi (saniye)
+            insert_queue_size: Eklenmeyi bekleyen en fazla batch (embed aşamasını frenler)
+        """
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.insert_queue_size = insert_queue_size
+
+        self.token_counter = TokenCounter(getattr(embeddings, "model_name", None) or "text-embedding-ada-002")
+
+    async def _embed_with_backoff(self, texts: List[str], stats: Dict[str, Any]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return await self.embeddings.aembed_documents(texts)
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = _retry_after_seconds(e) if _is_rate_limit_error(e) else None
+                if delay is None:
+                    delay = self.base_delay * (2 ** (attempt - 1)) + random.uniform(0, self.base_delay)
+                stats["retries"] += 1
+                if _is_rate_limit_error(e):
+                    stats["rate_limited"] += 1
+                print(f"Embedding isteği başarısız ({attempt}/{self.max_retries}), {delay:.1f} sn sonra tekrar denenecek: {str(e)}")
+                await asyncio.sleep(delay)
+
+    async def run(self,
+                  ids: List[str],
+                  texts: List[str],
+                  metadatas: List[Any],
+                  insert_fn: Callable[[List[str], List[str], List[Any], List[List[float]]], Any],
+                  progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """
+        Parçaları embed eder ve insert_fn ile ekler
+
+        Args:
+            ids: Parça kimlikleri
+            texts: Parça metinleri
+            metadatas: Parça metadata'ları
+            insert_fn: Senkron ekleme fonksiyonu (iş parçacığı havuzunda çalıştırılır)
+            progress: Verilirse her batch sonrası chunks_embedded / chunks_inserted ile çağrılır
+
+        Returns:
+            Dict: Parça, batch, hata ve hız (chunks/s) istatistikleri
+        """
+        async def single_group():
+            yield ids, texts, metadatas
+
+        return await self.run_stream(single_group(), insert_fn, progress)
+
+    async def run_stream(self,
+                         groups: AsyncIterable[Tuple[List[str], List[str], List[Any]]],
+                         insert_fn: Callable[[List[str], List[str], List[Any], List[List[float]]], Any],
+                         progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """
+        Parça grupları geldikçe embed eder ve insert_fn ile ekler
+
+        Parçalar token bütçeli batch'lerde toplanır. Dolan batch hemen gönderilir; boşta
+        embedding isteği yuvası varsa her grup sonunda dolmamış batch de gönderilir, böylece
+        kaynak (ör. PDF okuma) sürerken embedding başlar, yuvalar doluyken batch'ler büyür.
+        Embedding istekleri max_in_flight ile sınırlanır, tamamlanan batch'ler kuyruk
+        üzerinden ekleme aşamasına aktarılır; ekleme sürerken sonraki batch'lerin
+        embedding'i devam eder.
+
+        Args:
+            groups: (kimlikler, metinler, metadata'lar) grupları üreten async iterator
+            insert_fn: Senkron ekleme fonksiyonu (iş parçacığı havuzunda çalıştırılır)
+            progress: Verilirse her batch sonrası chunks_embedded / chunks_inserted ile çağrılır
+
+        Returns:
+            Dict: Parça, batch, hata ve hız (chunks/s) istatistikleri
+        """
+        started = time.perf_counter()
+        ids: List[str] = []
+        texts: List[str] = []
+        metadatas: List[Any] = []
+        stats = {
+            "chunks": 0,
+            "batches": 0,
+            "embedded": 0,
+            "inserted": 0,
+            "failed": 0,
+            "retries": 0,
+            "rate_limited": 0
+        }
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.insert_queue_size)
+        embed_tasks: List[asyncio.Task] = []
+        # Gönderilmiş ama embedding'i bitmemiş batch sayısı
+        active = [0]
+
+        async def embed_batch(indices: List[int]) -> None:
+            try:
+                async with semaphore:
+                    batch_texts = [texts[i] for i in indices]
+                    try:
+                        vectors = await self._embed_with_backoff(batch_texts, stats)
+                    except Exception as e:
+                        print(f"Embedding batch hatası ({len(indices)} parça atlandı): {str(e)}")
+                        stats["failed"] += len(indices)
+                        return
+                    stats["embedded"] += len(indices)
+                    if progress:
+                        progress(chunks_embedded=stats["embedded"])
+            finally:
+                active[0] -= 1
+            await queue.put((indices, vectors))
+
+        def submit(indices: List[int]) -> None:
+            active[0] += 1
+            stats["batches"] += 1
+            embed_tasks.append(asyncio.create_task(embed_batch(indices)))
+
+        async def insert_worker() -> None:
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    indices, vectors = item
+                    try:
+                        await run_blocking(
+                            insert_fn,
+                            [ids[i] for i in indices],
+                            [texts[i] for i in indices],
+                            [metadatas[i] for i in indices],
+                            vectors
+                        )
+                        stats["inserted"] += len(indices)
+                        if progress:
+                            progress(chunks_inserted=stats["inserted"])
+                    except Exception as e:
+                        print(f"Milvus ekleme hatası ({len(indices)} parça): {str(e)}")
+                        stats["failed"] += len(indices)
+                finally:
+                    queue.task_done()
+
+        inserter = asyncio.create_task(insert_worker())
+        try:
+            pending: List[int] = []
+            pending_tokens = 0
+            async for group_ids, group_texts, group_metadatas in groups:
+                for entity_id, text, metadata in zip(group_ids, group_texts, group_metadatas):
+                    tokens = min(self.token_counter.count(text), MAX_INPUT_TOKENS)
+                    if pending and (pending_tokens + tokens > self.max_batch_tokens or len(pending) >= MAX_BATCH_INPUTS):
+                        submit(pending)
+                        pending = []
+                        pending_tokens = 0
+                    pending.append(len(texts))
+                    pending_tokens += tokens
+                    ids.append(entity_id)
+                    texts.append(text)
+                    metadatas.append(metadata)
+                stats["chunks"] = len(texts)
+                if pending and active[0] < self.max_in_flight:
+                    submit(pending)
+                    pending = []
+                    pending_tokens = 0
+            if pending:
+                submit(pending)
+            await asyncio.gather(*embed_tasks)
+            await queue.put(None)
+            await inserter
+        finally:
+            for task in embed_tasks:
+                if not task.done():
+                    task.cancel()
+            if not inserter.done():
+                inserter.cancel()
+
+        elapsed = time.perf_counter() - started
+        stats["elapsed_seconds"] = round(elapsed, 2)
+        stats["chunks_per_second"] = round(stats["inserted"] / elapsed, 2) if elapsed > 0 else None
+        return stats
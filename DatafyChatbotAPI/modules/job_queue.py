@@ -0,0 +1,342 @@
+# job_queue.py
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import threading
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+from modules.executor import run_blocking
+
+# İlerleme alanları ve yüzde hesabında kullanılan payda alanları
+PROGRESS_FIELDS = {
+    "pages_parsed": "pages_total",
+    "chunks_embedded": "chunks_total",
+    "chunks_inserted": "chunks_total"
+}
+
+
+class IngestionJobQueue:
+    """
+    Döküman yükleme işlerini SQLite'ta tutan, sınırlı sayıda işçiyle çalıştıran kalıcı kuyruk
+
+    Süreç kapanırsa yarım kalan işler kira süresi dolunca yeniden kuyruğa alınır;
+    manifest sayesinde önceden eklenmiş batch'ler tekrar embed edilmez.
+    """
+    def __init__(self, path: str, worker_count: int = 2, lease_seconds: float = 300, max_attempts: int = 3, poll_interval: float = 1.0, progress_interval: float = 1.0):
+        """
+        Args:
+            path: SQLite dosya yolu (tüm uvicorn işçileri aynı dosyayı paylaşır)
+            worker_count: Bu süreçte aynı anda çalışacak en fazla iş
+            lease_seconds: Kalp atışı bu süreden eski işler sahipsiz sayılıp yeniden kuyruğa alınır
+            max_attempts: Bir işin en fazla kaç kez başlatılabileceği
+            poll_interval: Boş kuyrukta yoklama aralığı (saniye)
+            progress_interval: İlerleme bilgisinin SQLite'a yazılma aralığı (saniye)
+        """
+        self.path = path
+        self.worker_count = worker_count
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                message TEXT,
+                file_path TEXT NOT NULL,
+                owns_file INTEGER NOT NULL DEFAULT 1,
+                collection_name TEXT NOT NULL,
+                document_type TEXT NOT NULL,
+                source TEXT,
+                checksum TEXT,
+                pages_total INTEGER,
+                pages_parsed INTEGER NOT NULL DEFAULT 0,
+                chunks_total INTEGER,
+                chunks_embedded INTEGER NOT NULL DEFAULT 0,
+                chunks_inserted INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                heartbeat_at REAL
+            )
+            """
+        )
+        # checksum sütunu sonradan eklendi, eski kuyruk dosyaları için
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "checksum" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN checksum TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_checksum ON jobs (checksum, collection_name)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        self._handler = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def _execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            self._conn.commit()
+            return cursor
+
+    def enqueue(self, file_path: str, collection_name: str, document_type: str = "pdf", source: Optional[str] = None, owns_file: bool = True, checksum: Optional[str] = None) -> str:
+        """
+        Yeni bir yükleme işi ekler
+
+        Args:
+            file_path: İşlenecek dosya yolu
+            collection_name: Hedef koleksiyon
+            document_type: Döküman tipi
+            source: Manifest için kaynak adı
+            owns_file: İş bitince dosya silinsin mi (geçici yüklemeler için)
+            checksum: Dosyanın sha256 özeti (aynı dosyanın tekrar yüklenmesini yakalamak için)
+
+        Returns:
+            str: İş kimliği
+        """
+        task_id = str(uuid.uuid4())
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (task_id, status, message, file_path, owns_file, collection_name, document_type, source, checksum, created_at, updated_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (task_id, "Döküman işleme sıraya alındı", file_path, int(owns_file), collection_name, document_type, source, checksum, now, now)
+        )
+        return task_id
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        İşin durumunu ve ilerleme yüzdelerini döndürür
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["progress"] = {
+            field: {
+                "done": job[field],
+                "total": job[total_field],
+                "percent": round(100.0 * job[field] / job[total_field], 1) if job[total_field] else (100.0 if job["status"] == "completed" else None)
+            }
+            for field, total_field in PROGRESS_FIELDS.items()
+        }
+        return job
+
+    def find_duplicate(self, checksum: str, collection_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Aynı koleksiyona aynı içerikle kuyrukta bekleyen, işlenen veya tamamlanmış işi döndürür
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT task_id, status FROM jobs WHERE checksum = ? AND collection_name = ? "
+                "AND status IN ('queued', 'processing', 'completed') ORDER BY created_at DESC LIMIT 1",
+                (checksum, collection_name)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def forget_checksums(self, collection_names: List[str]) -> None:
+        """
+        Silinen veya sıfırlanan koleksiyonlar için eski yüklemelerin özetlerini bırakır,
+        böylece aynı dosya yeniden yüklenebilir
+        """
+        placeholders = ",".join("?" * len(collection_names))
+        self._execute(f"UPDATE jobs SET checksum = NULL WHERE collection_name IN ({placeholders})", tuple(collection_names))
+
+    def update_progress(self, task_id: str, **fields) -> None:
+        """
+        İşin ilerleme alanlarını günceller (pages_total, pages_parsed, chunks_total, chunks_embedded, chunks_inserted)
+        """
+        allowed = {"pages_total", "pages_parsed", "chunks_total", "chunks_embedded", "chunks_inserted"}
+        updates = {key: value for key, value in fields.items() if key in allowed}
+        if not updates:
+            return
+        assignments = ", ".join(f"{key} = ?" for key in updates)
+        now = time.time()
+        self._execute(
+            f"UPDATE jobs SET {assignments}, updated_at = ?, heartbeat_at = ? WHERE task_id = ?",
+            (*updates.values(), now, now, task_id)
+        )
+
+    def unfinished_files(self) -> List[str]:
+        """
+        Henüz bitmemiş işlerin dosya yollarını döndürür (temizlikte silinmemeleri için)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT file_path FROM jobs WHERE status IN ('queued', 'processing')").fetchall()
+        return [row["file_path"] for row in rows]
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Kira süresi dolmuş işleri geri alır ve sıradaki işi bu süreç adına atomik olarak sahiplenir
+        """
+        now = time.time()
+        with self._lock:
+            # Sahibi ölmüş işleri yeniden kuyruğa al, deneme hakkı bitenleri başarısız say
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', message = 'İş tekrar tekrar yarım kaldı, deneme hakkı doldu', updated_at = ? "
+                "WHERE status = 'processing' AND heartbeat_at < ? AND attempts >= ?",
+                (now, now - self.lease_seconds, self.max_attempts)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', message = 'Yarım kalan iş yeniden kuyruğa alındı', worker = NULL, updated_at = ? "
+                "WHERE status = 'processing' AND heartbeat_at < ?",
+                (now, now - self.lease_seconds)
+            )
+            row = self._conn.execute(
+                "SELECT task_id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._conn.commit()
+                return None
+
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'processing', message = 'Döküman işleniyor...', worker = ?, "
+                "attempts = attempts + 1, updated_at = ?, heartbeat_at = ? WHERE task_id = ? AND status = 'queued'",
+                (self.worker_id, now, now, row["task_id"])
+            )
+            self._conn.commit()
+            if cursor.rowcount != 1:
+                return None
+            return dict(self._conn.execute("SELECT * FROM jobs WHERE task_id = ?", (row["task_id"],)).fetchone())
+
+    def _finish(self, task_id: str, result: Dict[str, Any]) -> None:
+        status = "completed" if result.get("success") else "failed"
+        self._execute(
+            "UPDATE jobs SET status = ?, message = ?, result = ?, worker = NULL, updated_at = ? WHERE task_id = ?",
+            (status, result.get("message", ""), json.dumps(result, ensure_ascii=False, default=str), time.time(), task_id)
+        )
+
+    async def _heartbeat(self, task_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await run_blocking(self._execute, "UPDATE jobs SET heartbeat_at = ? WHERE task_id = ?", (time.time(), task_id))
+
+    async def _flush_progress(self, task_id: str, pending: Dict[str, int]) -> None:
+        if not pending:
+            return
+        updates = dict(pending)
+        pending.clear()
+        try:
+            await run_blocking(self.update_progress, task_id, **updates)
+        except Exception as e:
+            print(f"İlerleme yazma hatası ({task_id}): {str(e)}")
+
+    async def _progress_flusher(self, task_id: str, pending: Dict[str, int]) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self._flush_progress(task_id, pending)
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        task_id = job["task_id"]
+        print(f"Yükleme işi başladı: {task_id} ({job['file_path']} -> {job['collection_name']}, deneme {job['attempts']})")
+
+        # İlerleme event loop'u bloklamamak için bellekte biriktirilir ve aralıklarla yazılır
+        pending: Dict[str, int] = {}
+
+        def progress(**fields):
+            pending.update(fields)
+
+        heartbeat = asyncio.create_task(self._heartbeat(task_id))
+        flusher = asyncio.create_task(self._progress_flusher(task_id, pending))
+        try:
+            result = await self._handler(job, progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            import traceback
+            print(f"Yükleme işi hatası ({task_id}):\n{traceback.format_exc()}")
+            result = {"success": False, "message": f"İşlem hatası: {str(e)}"}
+        finally:
+            heartbeat.cancel()
+            flusher.cancel()
+
+        await self._flush_progress(task_id, pending)
+
+        await run_blocking(self._finish, task_id, result)
+        print(f"Yükleme işi bitti: {task_id} - {result.get('message')}")
+
+        # Geçici dosya iş bitince silinir
+        if job["owns_file"] and os.path.exists(job["file_path"]):
+            try:
+                os.remove(job["file_path"])
+            except Exception as cleanup_error:
+                print(f"Geçici dosya silinemedi: {str(cleanup_error)}")
+
+    async def _worker_loop(self) -> None:
+        errors = 0
+        while True:
+            try:
+                job = await run_blocking(self._claim_next)
+                if job is None:
+                    errors = 0
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                task = asyncio.current_task()
+                self._running[job["task_id"]] = task
+                try:
+                    await self._run_job(job)
+                finally:
+                    self._running.pop(job["task_id"], None)
+                errors = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Ör. "database is locked": işçi ölmez, bekleyip devam eder; yarım kalan iş kira dolunca geri alınır
+                errors += 1
+                delay = min(self.poll_interval * (2 ** errors), 30.0)
+                print(f"Yükleme kuyruğu işçi hatası, {delay:.1f} sn sonra devam edilecek: {str(e)}")
+                await asyncio.sleep(delay)
+
+    def start(self, handler: Callable[[Dict[str, Any], Callable[..., None]], Awaitable[Dict[str, Any]]]) -> None:
+        """
+        İşçi görevlerini başlatır
+
+        Args:
+            handler: İşi çalıştıran fonksiyon; (iş kaydı, progress(**alanlar)) alır ve sonuç dict'i döndürür
+        """
+        if self._workers:
+            return
+        self._handler = handler
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self.worker_count)]
+        print(f"Yükleme kuyruğu başlatıldı: {self.worker_count} işçi ({self.path})")
+
+    async def stop(self) -> None:
+        """
+        İşçileri durdurur; yarım kalan işler bir sonraki açılışta kaldıkları yerden devam eder
+        """
+        running = list(self._running.keys())
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for task_id in running:
+            self._execute(
+                "UPDATE jobs SET status = 'queued', message = 'Sunucu kapandı, iş yeniden kuyruğa alındı', worker = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE task_id = ? AND status = 'processing'",
+                (time.time(), task_id)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {
+            "worker_count": self.worker_count,
+            "running_here": len(self._running),
+            "jobs": {row["status"]: row["count"] for row in rows}
+        }
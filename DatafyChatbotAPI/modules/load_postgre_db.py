@@ -89,8 +89,27 @@ def load_data(csv_path: str):
                 ))
                 count += 1
 
+        # Bump the catalog version so running API processes reload their in-memory copy
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS kaynaklar_meta (
+                id INTEGER PRIMARY KEY,
+                version BIGINT NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+
+            INSERT INTO kaynaklar_meta (id, version, updated_at)
+            VALUES (1, 1, now())
+            ON CONFLICT (id) DO UPDATE
+            SET version = kaynaklar_meta.version + 1, updated_at = now()
+            RETURNING version;
+        """)
+        version = cursor.fetchone()[0]
+
+        # Delivered to LISTEN-ing API processes when the transaction commits
+        cursor.execute("SELECT pg_notify('kaynaklar_updated', %s)", (str(version),))
+
         conn.commit()
-        print(f"[SUCCESS] Inserted {count} rows into 'kaynaklar'")
+        print(f"[SUCCESS] Inserted {count} rows into 'kaynaklar' (catalog version {version})")
 
     except Exception as e:
         print(f"[ERROR] Failed during execution: {e}")
@@ -0,0 +1,163 @@
+# milvus_manager.py
+import time
+import threading
+from typing import Dict, Any, Optional, Tuple
+from pymilvus import connections, utility, Collection
+
+# pymilvus hata kodları: koleksiyon yok / yüklü değil
+_STALE_COLLECTION_CODES = {100, 101}
+_STALE_COLLECTION_MESSAGES = ("collection not found", "collection not loaded", "can't find collection", "collection not exist")
+
+
+def _is_stale_collection_error(error: Exception) -> bool:
+    """
+    Koleksiyon silinip yeniden oluşturulduğunda veya bellekten boşaltıldığında alınan hatalar
+    """
+    if getattr(error, "code", None) in _STALE_COLLECTION_CODES:
+        return True
+    message = str(error).lower()
+    return any(text in message for text in _STALE_COLLECTION_MESSAGES)
+
+
+class MilvusCollectionManager:
+    """
+    Tek bir bağlantı alias'ı üzerinden koleksiyonları süreç boyunca yüklü tutan yönetici
+    """
+    def __init__(self, milvus_host: str = "localhost", milvus_port: str = "19530", alias: str = "default"):
+        """
+        Args:
+            milvus_host: Milvus sunucu adresi
+            milvus_port: Milvus sunucu portu
+            alias: Tüm çağrıların paylaşacağı bağlantı alias'ı
+        """
+        self.milvus_host = milvus_host
+        self.milvus_port = milvus_port
+        self.alias = alias
+
+        self._collections: Dict[str, Collection] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Yavaş bir load() yalnızca kendi koleksiyonunu bekletir
+        self._collection_locks: Dict[str, threading.Lock] = {}
+
+    def connect(self) -> None:
+        """
+        Bağlantı yoksa kurar, varsa mevcut bağlantıyı kullanır
+        """
+        if not connections.has_connection(self.alias):
+            connections.connect(alias=self.alias, host=self.milvus_host, port=self.milvus_port)
+
+    def has_collection(self, name: str) -> bool:
+        self.connect()
+        return utility.has_collection(name, using=self.alias)
+
+    def get_collection(self, name: str, load: bool = True) -> Collection:
+        """
+        Koleksiyon nesnesini döndürür, istenirse yalnızca ilk seferde belleğe yükler
+
+        Args:
+            name: Koleksiyon adı
+            load: Arama için belleğe yüklensin mi
+
+        Returns:
+            Collection: Paylaşılan koleksiyon nesnesi
+        """
+        with self._collection_lock(name):
+            with self._lock:
+                collection = self._collections.get(name)
+                stats = self._stats.get(name)
+
+            if collection is None:
+                self.connect()
+                collection = Collection(name=name, using=self.alias)
+                stats = {"loaded": False, "load_ms": None, "searches": 0, "search_ms_total": 0.0, "last_search_ms": None}
+                with self._lock:
+                    self._collections[name] = collection
+                    self._stats[name] = stats
+
+            if load and not stats["loaded"]:
+                started = time.perf_counter()
+                collection.load()
+                with self._lock:
+                    stats["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                    stats["loaded"] = True
+                print(f"Milvus koleksiyonu belleğe yüklendi: {name} ({stats['load_ms']} ms)")
+
+            return collection
+
+    def _collection_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._collection_locks.setdefault(name, threading.Lock())
+
+    def search(self, name: str, **search_kwargs):
+        """
+        Yüklü koleksiyonda arama yapar ve gecikmeyi kaydeder
+
+        Koleksiyon dışarıdan silinip yeniden oluşturulduysa (ör. load_coaches.py) ya da
+        bellekten boşaltıldıysa nesne bir kez yenilenip arama tekrarlanır. Diğer hatalar
+        (geçersiz filtre ifadesi, boyut uyuşmazlığı vb.) tekrar denenmeden iletilir.
+        """
+        try:
+            collection = self.get_collection(name)
+            started = time.perf_counter()
+            results = collection.search(**search_kwargs)
+        except Exception as e:
+            if not _is_stale_collection_error(e):
+                raise
+            print(f"Milvus arama hatası ({name}), koleksiyon yenileniyor: {str(e)}")
+            self.forget(name)
+            collection = self.get_collection(name)
+            started = time.perf_counter()
+            results = collection.search(**search_kwargs)
+
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is not None:
+                stats["searches"] += 1
+                stats["search_ms_total"] += elapsed
+                stats["last_search_ms"] = round(elapsed, 1)
+        return results
+
+    def forget(self, name: str) -> None:
+        """
+        Silinen veya yeniden oluşturulan bir koleksiyonun önbellekteki nesnesini bırakır
+        """
+        with self._lock:
+            self._collections.pop(name, None)
+            self._stats.pop(name, None)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Koleksiyonların yüklenme durumunu ve arama gecikmelerini döndürür
+        """
+        with self._lock:
+            return {
+                "connected": connections.has_connection(self.alias),
+                "collections": {
+                    name: {
+                        "loaded": stats["loaded"],
+                        "load_ms": stats["load_ms"],
+                        "searches": stats["searches"],
+                        "avg_search_ms": round(stats["search_ms_total"] / stats["searches"], 1) if stats["searches"] else None,
+                        "last_search_ms": stats["last_search_ms"]
+                    }
+                    for name, stats in self._stats.items()
+                }
+            }
+
+
+# (host, port) başına tek yönetici
+_managers: Dict[Tuple[str, str], MilvusCollectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_milvus_manager(milvus_host: str = "localhost", milvus_port: str = "19530") -> MilvusCollectionManager:
+    """
+    Verilen sunucu için paylaşılan koleksiyon yöneticisini döndürür
+    """
+    key = (milvus_host, str(milvus_port))
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = MilvusCollectionManager(milvus_host, str(milvus_port))
+        return _managers[key]
@@ -0,0 +1,162 @@
+# pdf_extraction.py
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, AsyncIterator
+from modules.executor import run_blocking
+
+
+def _extract_with_pdfminer(file_path: str, page_no: int) -> str:
+    from pdfminer.high_level import extract_text
+    return extract_text(file_path, page_numbers=[page_no - 1]) or ""
+
+
+def _extract_page_range(file_path: str, page_numbers: List[int]) -> List[Dict[str, Any]]:
+    """
+    Verilen sayfaları ayrı bir süreçte okur (süreç havuzunda çalışır, bu yüzden modül seviyesindedir)
+
+    Önce pypdf denenir; okunamayan her sayfa için yalnızca o sayfa pdfminer ile okunur.
+
+    Args:
+        file_path: PDF dosya yolu
+        page_numbers: Okunacak sayfa numaraları (1'den başlar)
+
+    Returns:
+        List[Dict]: Her sayfa için page, text, method, ms ve varsa error
+    """
+    reader = None
+    try:
+        from pypdf import PdfReader
+        reader = PdfReader(file_path)
+    except Exception as e:
+        print(f"PyPDF okuma hatası, sayfalar PDFMiner ile okunacak: {str(e)}")
+
+    results = []
+    for page_no in page_numbers:
+        started = time.perf_counter()
+        result = {"page": page_no, "text": "", "method": "pypdf"}
+        try:
+            if reader is None:
+                raise RuntimeError("PdfReader açılamadı")
+            result["text"] = reader.pages[page_no - 1].extract_text() or ""
+        except Exception as e:
+            print(f"Sayfa {page_no} okuma hatası, PDFMiner deneniyor: {str(e)}")
+            result["method"] = "pdfminer"
+            try:
+                result["text"] = _extract_with_pdfminer(file_path, page_no)
+            except Exception as pdf_miner_error:
+                print(f"Sayfa {page_no} PDFMiner okuma hatası: {str(pdf_miner_error)}")
+                result["method"] = "failed"
+                result["error"] = str(pdf_miner_error)
+        result["text"] = result["text"].strip()
+        result["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        results.append(result)
+    return results
+
+
+def count_pages(file_path: str) -> int:
+    """
+    PDF'in sayfa sayısını döndürür
+    """
+    try:
+        from pypdf import PdfReader
+        return len(PdfReader(file_path).pages)
+    except Exception as e:
+        print(f"PyPDF sayfa sayma hatası, PDFMiner deneniyor: {str(e)}")
+        from pdfminer.pdfpage import PDFPage
+        with open(file_path, "rb") as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+
+
+class ParallelPDFExtractor:
+    """
+    Sayfa aralıklarını süreç havuzuna dağıtarak PDF metnini çok çekirdekli çıkaran sınıf
+    """
+    def __init__(self, max_workers: Optional[int] = None, pages_per_shard: int = 16):
+        """
+        Args:
+            max_workers: Süreç sayısı (None ise CPU sayısı)
+            pages_per_shard: Bir sürece tek seferde verilen sayfa sayısı
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_shard = pages_per_shard
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    async def stream_pages(self,
+                           file_path: str,
+                           page_numbers: Optional[Iterable[int]] = None,
+                           timings: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Sayfaları parça parça okur ve biten her parçanın sayfalarını hemen döndürür
+
+        Sayfalar tamamlanma sırasıyla gelir, numara sırasıyla değil.
+
+        Args:
+            file_path: PDF dosya yolu
+            page_numbers: Yalnızca bu sayfaları oku (None ise tümü)
+            timings: Verilirse her sayfanın page, method ve ms bilgisi eklenir
+
+        Yields:
+            Dict: page, text, method, ms ve okunacak toplam sayfa (total_pages)
+        """
+        total_pages = await run_blocking(count_pages, file_path)
+        if page_numbers is None:
+            pages = list(range(1, total_pages + 1))
+        else:
+            pages = sorted(p for p in set(page_numbers) if 1 <= p <= total_pages)
+
+        shards = [pages[i:i + self.pages_per_shard] for i in range(0, len(pages), self.pages_per_shard)]
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        futures = [loop.run_in_executor(pool, _extract_page_range, file_path, shard) for shard in shards]
+
+        try:
+            for future in asyncio.as_completed(futures):
+                for result in await future:
+                    if timings is not None:
+                        timings.append({"page": result["page"], "method": result["method"], "ms": result["ms"]})
+                    result["total_pages"] = len(pages)
+                    yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def extract_pages(self, file_path: str, page_numbers: Optional[Iterable[int]] = None) -> Dict[int, str]:
+        """
+        İstenen sayfaların metinlerini sayfa numarasına göre döndürür
+        """
+        return {result["page"]: result["text"] async for result in self.stream_pages(file_path, page_numbers)}
+
+    @staticmethod
+    def summarize(timings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Sayfa bazlı süreleri özetler
+        """
+        if not timings:
+            return {"pages": 0}
+        slowest = max(timings, key=lambda t: t["ms"])
+        return {
+            "pages": len(timings),
+            "pdfminer_pages": sum(1 for t in timings if t["method"] == "pdfminer"),
+            "failed_pages": sum(1 for t in timings if t["method"] == "failed"),
+            "total_page_ms": round(sum(t["ms"] for t in timings), 1),
+            "slowest_page": slowest["page"],
+            "slowest_page_ms": slowest["ms"],
+            "page_timings": sorted(timings, key=lambda t: t["page"])
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
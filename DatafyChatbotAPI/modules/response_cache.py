@@ -0,0 +1,148 @@
+# response_cache.py
+import time
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional, Iterable
+
+
+class SemanticResponseCache:
+    """
+    Anlamca yakın sorgular için daha önce üretilmiş yanıtları döndüren önbellek
+    """
+    def __init__(self,
+                 max_distance: float = 0.05,
+                 ttl_seconds: float = 3600,
+                 max_entries: int = 1000,
+                 disabled_agents: Optional[Iterable[str]] = None):
+        """
+        Args:
+            max_distance: Önbellek isabeti için izin verilen en büyük kosinüs uzaklığı
+            ttl_seconds: Bir yanıtın önbellekte kalabileceği süre
+            max_entries: Toplam en fazla kayıt sayısı (aşılırsa en eski erişilen silinir)
+            disabled_agents: Yanıtları önbelleğe alınmayacak ajanlar (ör. canlı veriye bağlı koç ajanı)
+        """
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disabled_agents = set(disabled_agents) if disabled_agents is not None else {"koç"}
+
+        # Vektörler önceden ayrılmış bir matriste tutulur; her satır bir kayıt yuvasıdır
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._created = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._agents = np.empty(max_entries, dtype=object)
+        self._groups = np.empty(max_entries, dtype=object)
+        self._responses: List[Optional[str]] = [None] * max_entries
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def is_enabled_for(self, agent: str) -> bool:
+        return agent not in self.disabled_agents
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        return array / np.linalg.norm(array)
+
+    @staticmethod
+    def _group(agent: str, scope: Optional[str]) -> str:
+        # Kapsam (ör. kullanıcı kimliği) verilirse kayıt yalnızca aynı kapsamda eşleşir
+        # Ayraç olarak \0 kullanılmaz: numpy karşılaştırmada sondaki boş karakterleri atar
+        return f"{agent}|{scope or ''}"
+
+    def _live(self, now: float) -> np.ndarray:
+        return self._valid & (now - self._created <= self.ttl_seconds)
+
+    def lookup(self, vector: List[float], agent: str, scope: Optional[str] = None) -> Optional[str]:
+        """
+        Aynı ajana yönlendirilmiş, aynı kapsamdaki ve yeterince yakın bir sorgunun yanıtını döndürür
+
+        Args:
+            vector: Sorgu embedding'i
+            agent: Sorgunun yönlendirildiği ajan
+            scope: Kayıtların paylaşıldığı kapsam (ör. kullanıcı kimliği), None ise ortak
+
+        Returns:
+            Optional[str]: Önbellekteki yanıt, yoksa None
+        """
+        if not self.is_enabled_for(agent):
+            return None
+
+        query = self._normalize(vector)
+        now = time.time()
+        with self._lock:
+            if self._matrix is not None and self._matrix.shape[1] == query.shape[0]:
+                mask = self._live(now) & (self._groups == self._group(agent, scope))
+                if mask.any():
+                    similarities = np.where(mask, self._matrix @ query, -np.inf)
+                    best = int(np.argmax(similarities))
+                    if 1.0 - float(similarities[best]) <= self.max_distance:
+                        self._last_used[best] = now
+                        self.hits += 1
+                        return self._responses[best]
+
+            self.misses += 1
+            return None
+
+    def store(self, vector: List[float], agent: str, response: str, scope: Optional[str] = None) -> None:
+        """
+        Yanıtı önbelleğe ekler (yer yoksa süresi dolan ya da en eski erişilen kaydın yerine)
+        """
+        if not self.is_enabled_for(agent):
+            return
+
+        normalized = self._normalize(vector)
+        now = time.time()
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != normalized.shape[0]:
+                # İlk kayıtta (veya embedding boyutu değiştiğinde) matris ayrılır
+                self._matrix = np.zeros((self.max_entries, normalized.shape[0]), dtype=np.float32)
+                self._valid[:] = False
+
+            free = np.flatnonzero(~self._live(now))
+            slot = int(free[0]) if free.size else int(np.argmin(self._last_used))
+
+            self._matrix[slot] = normalized
+            self._valid[slot] = True
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._agents[slot] = agent
+            self._groups[slot] = self._group(agent, scope)
+            self._responses[slot] = response
+
+    def invalidate(self, agents: Optional[Iterable[str]] = None) -> int:
+        """
+        Verilen ajanların (verilmezse tümünün) kayıtlarını siler
+
+        Returns:
+            int: Silinen kayıt sayısı
+        """
+        with self._lock:
+            stale = self._live(time.time())
+            if agents is not None:
+                stale &= np.isin(self._agents, list(agents))
+            removed = int(stale.sum())
+            self._valid[stale] = False
+            for slot in np.flatnonzero(stale):
+                self._responses[slot] = None
+            self.invalidations += 1
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": int(self._live(time.time()).sum()),
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+                "ttl_seconds": self.ttl_seconds,
+                "disabled_agents": sorted(self.disabled_agents),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,82 @@
+# upload_limit.py
+import json
+from typing import Iterable
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Belirtilen yollara gelen istek gövdesini endpoint çalışmadan önce sınırlayan ASGI middleware'i
+
+    FastAPI UploadFile parametresini doldurmak için multipart gövdenin tamamını endpoint'ten
+    önce okur (ve diske aktarır); bu yüzden sınır endpoint içinde değil burada uygulanır.
+    Content-Length sınırı aşıyorsa gövde hiç okunmadan 413 döner. Content-Length yoksa
+    (chunked) okunan bayt sayılır, sınır aşılınca okuma kesilir ve yanıt 413 ile değiştirilir.
+    """
+    def __init__(self, app, paths: Iterable[str], max_bytes: int, message: str):
+        """
+        Args:
+            app: Sarılan ASGI uygulaması
+            paths: Sınırın uygulanacağı istek yolları
+            max_bytes: İzin verilen en büyük gövde boyutu (multipart başlıkları dahil)
+            message: 413 yanıtındaki mesaj
+        """
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+        self.message = message
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({"success": False, "message": self.message, "document_count": 0}, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                too_large = int(content_length) > self.max_bytes
+            except ValueError:
+                too_large = False
+            if too_large:
+                await self._reject(send)
+                return
+
+        state = {"received": 0, "exceeded": False, "started": False}
+
+        async def limited_receive():
+            if state["exceeded"]:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > self.max_bytes:
+                    # Gövdenin geri kalanı okunmaz; ayrıştırıcı bağlantı kopmuş gibi durur
+                    state["exceeded"] = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def limited_send(message):
+            if state["exceeded"]:
+                # Uygulamanın ayrıştırma hatası yanıtı yerine 413 gönderilir
+                if message["type"] == "http.response.start" and not state["started"]:
+                    state["started"] = True
+                    await self._reject(send)
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except Exception:
+            if not state["exceeded"]:
+                raise
+            if not state["started"]:
+                state["started"] = True
+                await self._reject(send)
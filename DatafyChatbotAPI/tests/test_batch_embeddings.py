@@ -0,0 +1,68 @@
+import asyncio
+
+from modules.agent import EducationAgentSystem, GuidanceAgent, MotivationAgent
+from modules.embedding_cache import CachedEmbeddings
+from modules.retrievers import GuidanceRetriever, MotivationRetriever
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.query_calls = []
+        self.batch_calls = []
+
+    async def aembed_query(self, text):
+        self.query_calls.append(text)
+        return [1.0, float(len(text))]
+
+    async def aembed_documents(self, texts):
+        self.batch_calls.append(list(texts))
+        return [[1.0, float(len(text))] for text in texts]
+
+
+class StubDecider:
+    async def decide_agent(self, query):
+        return "motivasyon" if "moral" in query else "rehberlik"
+
+
+def make_agent(agent_class, retriever_class, embeddings, prefix):
+    # Gerçek Milvus/OpenAI bağlantısı kurmamak için __init__ atlanır
+    retriever = retriever_class.__new__(retriever_class)
+    retriever.embeddings = embeddings
+    retriever.query_prefix = prefix
+    agent = agent_class.__new__(agent_class)
+    agent.agent_name = retriever_class.__name__
+    agent.retriever = retriever
+
+    async def get_response(query, docs=None):
+        # Retriever'ın Milvus'a göndereceği vektörü ister
+        await retriever.embeddings.aembed_query(retriever.search_query(query))
+        return {"agent": agent.agent_name, "response": query}
+
+    agent.get_response = get_response
+    return agent
+
+
+def test_process_batch_embeds_retriever_search_texts_up_front():
+    base = CountingEmbeddings()
+    embeddings = CachedEmbeddings(base, model_name="test")
+
+    system = EducationAgentSystem.__new__(EducationAgentSystem)
+    system.query_embeddings = embeddings
+    system.response_cache = None
+    system.decider = StubDecider()
+    system.agents = {
+        "rehberlik": make_agent(GuidanceAgent, GuidanceRetriever, embeddings, "Eğitim ve kariyer rehberliği konusunda"),
+        "motivasyon": make_agent(MotivationAgent, MotivationRetriever, embeddings, ""),
+    }
+
+    queries = ["hangi bölümü seçmeliyim", "moralim bozuk", "hangi bölümü seçmeliyim"]
+    output = asyncio.run(system.process_batch(queries))
+
+    assert [result["response"] for result in output["results"]] == queries
+    # Biri ham sorgular, biri retriever arama metinleri için; tekil embedding çağrısı yok
+    assert len(base.batch_calls) == 2
+    assert base.query_calls == []
+    assert set(base.batch_calls[1]) == {
+        "Eğitim ve kariyer rehberliği konusunda Eğitim ve kariyer rehberliği: hangi bölümü seçmeliyim",
+        "Motivasyon ve ilham: moralim bozuk",
+    }
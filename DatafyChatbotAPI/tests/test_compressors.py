@@ -0,0 +1,31 @@
+import asyncio
+
+from langchain.schema import Document
+
+from modules.compressors import BatchedLLMCompressor
+
+
+class StubChain:
+    def __init__(self, output):
+        self.output = output
+
+    async def arun(self, **kwargs):
+        return self.output
+
+
+def make_compressor(output):
+    compressor = BatchedLLMCompressor.__new__(BatchedLLMCompressor)
+    compressor.chain = StubChain(output)
+    return compressor
+
+
+def test_batched_compressor_extracts_passages():
+    docs = [Document(page_content="birinci", metadata={"i": 1}), Document(page_content="ikinci", metadata={"i": 2})]
+    result = asyncio.run(make_compressor('{"1": "bir", "2": ""}')._compress("soru", docs))
+    assert [(doc.page_content, doc.metadata) for doc in result] == [("bir", {"i": 1})]
+
+
+def test_batched_compressor_falls_back_on_json_list():
+    docs = [Document(page_content="birinci"), Document(page_content="ikinci")]
+    result = asyncio.run(make_compressor('["bir", "iki"]')._compress("soru", docs))
+    assert result == docs
@@ -0,0 +1,58 @@
+import time
+import asyncio
+
+from langchain.schema import Document
+
+from modules.retrievers import GuidanceRetriever
+from modules.compressors import build_compressor
+
+SEARCH_DELAY = 0.3
+CONCURRENT_QUERIES = 8
+
+
+class StubEmbeddings:
+    async def aembed_query(self, text):
+        return [0.0] * 4
+
+
+class StubHit:
+    def __init__(self, text):
+        self.entity = {"text": text, "metadata": {"page": 1}}
+
+
+class StubMilvus:
+    """Senkron ve yavaş pymilvus aramasını taklit eder"""
+    def search(self, name, **kwargs):
+        time.sleep(SEARCH_DELAY)
+        return [[StubHit(f"{name} belgesi")]]
+
+
+def make_retriever():
+    # Gerçek Milvus/OpenAI bağlantısı kurmamak için __init__ atlanır
+    retriever = GuidanceRetriever.__new__(GuidanceRetriever)
+    retriever.collection_name = "rehberlik_collection"
+    retriever.embeddings = StubEmbeddings()
+    retriever.milvus = StubMilvus()
+    retriever.compressor = build_compressor("none")
+    retriever.query_prefix = ""
+    retriever.search_k = 5
+    retriever.search_params = {"metric_type": "COSINE", "params": {"ef": 64}}
+    return retriever
+
+
+def test_concurrent_retrievals_are_not_serialized():
+    retriever = make_retriever()
+
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            retriever.get_relevant_documents(f"soru {i}") for i in range(CONCURRENT_QUERIES)
+        ))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+
+    assert all(len(docs) == 1 and isinstance(docs[0], Document) for docs in results)
+    assert results[0][0].metadata == {"page": 1}
+    # Aramalar sıralı çalışsaydı ~CONCURRENT_QUERIES * SEARCH_DELAY sürerdi
+    assert elapsed < SEARCH_DELAY * 2, f"{CONCURRENT_QUERIES} arama {elapsed:.2f} sn sürdü"
@@ -0,0 +1,57 @@
+import asyncio
+
+import numpy as np
+
+from modules.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    async def aembed_query(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0]
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_disk_tier_is_capped_and_keeps_recently_used(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = CachedEmbeddings(CountingEmbeddings(), model_name="test", max_entries=1, disk_path=path, max_disk_entries=3)
+
+    async def run():
+        for text in ["a", "bb", "ccc"]:
+            await cache.aembed_query(text)
+        await cache.aembed_query("a")  # diskten okunur, en son kullanılan olur
+        await cache.aembed_query("dddd")
+
+    asyncio.run(run())
+
+    assert cache.stats()["disk_entries"] == 3
+    reopened = CachedEmbeddings(CountingEmbeddings(), model_name="test", max_entries=10, disk_path=path, max_disk_entries=3)
+    assert set(reopened._lookup([reopened._key(t) for t in ["a", "bb", "ccc", "dddd"]])) == {
+        reopened._key("a"), reopened._key("ccc"), reopened._key("dddd")
+    }
+
+
+def test_memory_tier_keeps_float32_arrays_and_returns_lists():
+    cache = CachedEmbeddings(CountingEmbeddings(), model_name="test", max_entries=10)
+
+    first = asyncio.run(cache.aembed_query("soru"))
+    second = asyncio.run(cache.aembed_query("soru"))
+
+    stored = cache._memory[cache._key("soru")]
+    assert stored.dtype == np.float32
+    assert isinstance(first, list) and second == first
+    assert cache.base.calls == 1
+
+
+def test_zero_size_memory_tier_caches_nothing():
+    cache = CachedEmbeddings(CountingEmbeddings(), model_name="test", max_entries=0)
+
+    asyncio.run(cache.aembed_documents(["parça bir", "parça iki"]))
+
+    assert cache.stats()["memory_entries"] == 0
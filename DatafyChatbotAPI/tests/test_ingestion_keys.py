@@ -0,0 +1,124 @@
+import asyncio
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from modules import ingestion
+from modules.document_processor import DirectMilvusPDFProcessor
+from modules.ingestion import EmbeddingPipeline, IngestionManifest, is_valid_collection_name
+
+
+def test_collection_names_follow_milvus_rules():
+    assert is_valid_collection_name("rehberlik_collection")
+    assert is_valid_collection_name("_gizli2")
+    assert not is_valid_collection_name("2023_collection")
+    assert not is_valid_collection_name("matematik-1")
+    assert not is_valid_collection_name("türkçe_collection")
+    assert not is_valid_collection_name("")
+    assert not is_valid_collection_name("a" * 256)
+
+
+class StubEmbeddings:
+    model_name = "test"
+
+    def __init__(self):
+        self.embedded = 0
+
+    async def aembed_documents(self, texts):
+        self.embedded += len(texts)
+        return [[0.0, 1.0] for _ in texts]
+
+
+class StubTokenCounter:
+    # tiktoken kodlamasını indirmeye çalışmasın diye
+    def count(self, text):
+        return len(text) // 2 + 1
+
+
+class StubSchema:
+    fields = []
+
+
+class StubCollection:
+    def __init__(self):
+        self.ids = set()
+
+    def insert(self, data):
+        self.ids.update(data[0])
+
+    def delete(self, expr):
+        removed = {part.strip(' "') for part in expr[len("id in ["):-1].split(",")}
+        self.ids -= removed
+
+
+class StubMilvus:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_collection(self, name, load=True):
+        return self.collection
+
+
+def make_processor(tmp_path):
+    # Gerçek Milvus/OpenAI bağlantısı kurmamak için __init__ atlanır
+    processor = DirectMilvusPDFProcessor.__new__(DirectMilvusPDFProcessor)
+    processor.embeddings = StubEmbeddings()
+    processor.manifest = IngestionManifest(str(tmp_path / "manifest.sqlite"))
+    processor.pipeline = EmbeddingPipeline(processor.embeddings)
+    processor.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
+    processor.milvus = StubMilvus(StubCollection())
+    processor.ensure_collection_exists = lambda name: True
+    processor.get_collection_schema = lambda name: StubSchema()
+    return processor
+
+
+def test_modified_document_is_reingested_incrementally(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "TokenCounter", lambda model_name: StubTokenCounter())
+    processor = make_processor(tmp_path)
+    original = [(page, f"Sayfa {page} için yeterince uzun olan örnek rehberlik metni.") for page in range(1, 5)]
+    modified = original[:3] + [(5, "Sonradan eklenen sayfanın yeterince uzun örnek metni.")]
+
+    first = asyncio.run(processor.process_texts(original, "rehberlik_collection", source="kitap.pdf"))
+    second = asyncio.run(processor.process_texts(modified, "rehberlik_collection", source="kitap.pdf"))
+
+    assert first["stats"]["added"] == 4
+    assert (second["stats"]["skipped"], second["stats"]["added"], second["stats"]["removed"]) == (3, 1, 1)
+    assert processor.embeddings.embedded == 5
+    # Eski sürümün kaybolan parçası koleksiyonda kalmaz
+    assert len(processor.milvus.collection.ids) == 4
+
+
+class SlowExtractor:
+    # Sayfaları gecikmeli üretir ve embedding'in hangi sayfadan sonra başladığını kaydeder
+    def __init__(self, events, page_count=6):
+        self.events = events
+        self.page_count = page_count
+
+    async def stream_pages(self, file_path, timings=None):
+        for page in range(1, self.page_count + 1):
+            await asyncio.sleep(0.01)
+            timings.append({"page": page, "method": "pypdf", "ms": 10.0})
+            self.events.append(f"page:{page}")
+            yield {"page": page, "text": f"Sayfa {page} için yeterince uzun olan örnek rehberlik metni.", "total_pages": self.page_count}
+
+
+def test_pdf_chunks_are_embedded_while_pages_are_still_extracted(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "TokenCounter", lambda model_name: StubTokenCounter())
+    processor = make_processor(tmp_path)
+    events = []
+    processor.extractor = SlowExtractor(events)
+    aembed_documents = processor.embeddings.aembed_documents
+
+    async def record_embedding(texts):
+        events.append("embed")
+        return await aembed_documents(texts)
+
+    processor.embeddings.aembed_documents = record_embedding
+    pdf = tmp_path / "kitap.pdf"
+    pdf.write_bytes(b"%PDF")
+
+    result = asyncio.run(processor.process_pdf(str(pdf), "rehberlik_collection", source="kitap.pdf"))
+
+    assert result["stats"]["added"] == 6
+    assert result["extraction"]["pages"] == 6
+    assert events.index("embed") < events.index("page:6")
+    assert len(processor.milvus.collection.ids) == 6
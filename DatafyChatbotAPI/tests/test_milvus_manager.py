@@ -0,0 +1,53 @@
+import pytest
+from pymilvus import MilvusException
+
+from modules import milvus_manager
+from modules.milvus_manager import MilvusCollectionManager
+
+
+class StubCollection:
+    instances = []
+
+    def __init__(self, name, using=None):
+        self.name = name
+        self.loads = 0
+        self.searches = 0
+        self.error = None
+        StubCollection.instances.append(self)
+
+    def load(self):
+        self.loads += 1
+
+    def search(self, **kwargs):
+        self.searches += 1
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return [["sonuç"]]
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    StubCollection.instances = []
+    monkeypatch.setattr(milvus_manager, "Collection", StubCollection)
+    monkeypatch.setattr(MilvusCollectionManager, "connect", lambda self: None)
+    return MilvusCollectionManager()
+
+
+def test_stale_collection_is_reloaded_once(manager):
+    manager.get_collection("rehberlik_collection").error = MilvusException(code=101, message="collection not loaded")
+
+    assert manager.search("rehberlik_collection", data=[[0.0]]) == [["sonuç"]]
+    assert len(StubCollection.instances) == 2
+    assert StubCollection.instances[1].loads == 1
+
+
+def test_other_errors_are_not_retried(manager):
+    collection = manager.get_collection("koc_collection")
+    collection.error = MilvusException(code=1100, message="cannot parse expression: tyt_derece_son <=")
+
+    with pytest.raises(MilvusException):
+        manager.search("koc_collection", data=[[0.0]], expr="tyt_derece_son <=")
+
+    assert len(StubCollection.instances) == 1
+    assert collection.searches == 1
@@ -0,0 +1,30 @@
+import time
+
+from modules.response_cache import SemanticResponseCache
+
+
+def test_entries_are_not_shared_across_users():
+    cache = SemanticResponseCache(max_entries=4)
+    cache.store([1.0, 0.0, 0.0], "rehberlik", "A öğrencisinin netleri: 80", scope="user_a")
+
+    # Neredeyse aynı sorgu, farklı öğrenci
+    assert cache.lookup([1.0, 0.01, 0.0], "rehberlik", scope="user_b") is None
+    assert cache.lookup([1.0, 0.01, 0.0], "rehberlik", scope="user_a") == "A öğrencisinin netleri: 80"
+    assert cache.lookup([1.0, 0.01, 0.0], "rehberlik") is None
+
+
+def test_full_cache_replaces_least_recently_used_slot():
+    cache = SemanticResponseCache(max_entries=2)
+    cache.store([1.0, 0.0], "rehberlik", "birinci")
+    time.sleep(0.001)
+    cache.store([0.0, 1.0], "rehberlik", "ikinci")
+    time.sleep(0.001)
+    assert cache.lookup([1.0, 0.0], "rehberlik") == "birinci"
+
+    cache.store([0.7, 0.7], "rehberlik", "üçüncü")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup([0.0, 1.0], "rehberlik") is None
+    assert cache.lookup([1.0, 0.0], "rehberlik") == "birinci"
+    assert cache.invalidate(["rehberlik"]) == 2
+    assert cache.lookup([1.0, 0.0], "rehberlik") is None
@@ -0,0 +1,57 @@
+import asyncio
+
+from langchain.schema import Document
+
+from modules.agent import EducationAgentSystem, GuidanceAgent, MotivationAgent
+
+
+class StubRetriever:
+    def __init__(self, name):
+        self.name = name
+        self.searches = 0
+        self.compressions = 0
+
+    def search_query(self, query):
+        return query
+
+    async def search_documents(self, query):
+        self.searches += 1
+        return [Document(page_content=f"{self.name} ham belge")]
+
+    async def compress_documents(self, query, docs):
+        # LLM ile sıkıştırmayı temsil eder
+        self.compressions += 1
+        return [Document(page_content=f"{self.name} sıkıştırılmış belge")]
+
+
+class StubDecider:
+    async def decide_agent(self, query):
+        await asyncio.sleep(0.01)
+        return "rehberlik"
+
+
+def make_agent(agent_class, name):
+    agent = agent_class.__new__(agent_class)
+    agent.agent_name = name
+    agent.retriever = StubRetriever(name)
+    return agent
+
+
+def test_speculation_only_compresses_for_the_chosen_agent():
+    system = EducationAgentSystem.__new__(EducationAgentSystem)
+    system.response_cache = None
+    system.speculative = True
+    system.speculative_agents = ["rehberlik", "motivasyon"]
+    system.decider = StubDecider()
+    system.agents = {"rehberlik": make_agent(GuidanceAgent, "rehberlik"), "motivasyon": make_agent(MotivationAgent, "motivasyon")}
+
+    timings = {}
+    route = asyncio.run(system._route("hangi bölümü seçmeliyim", 0.0, timings))
+
+    guidance = system.agents["rehberlik"].retriever
+    motivation = system.agents["motivasyon"].retriever
+    assert route["agent_type"] == "rehberlik"
+    assert [doc.page_content for doc in route["docs"]] == ["rehberlik sıkıştırılmış belge"]
+    assert (guidance.searches, guidance.compressions) == (1, 1)
+    assert motivation.compressions == 0
+    assert timings["compression"]["status"] == "done"
@@ -0,0 +1,52 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from modules.upload_limit import UploadSizeLimitMiddleware
+
+LIMIT = 4096
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, paths=["/upload"], max_bytes=LIMIT, message="çok büyük")
+    calls = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"size": len(await file.read())}
+
+    return TestClient(app), calls
+
+
+def test_small_upload_passes():
+    client, calls = make_client()
+
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 100)})
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+    assert calls == ["a.pdf"]
+
+
+def test_oversized_upload_is_rejected_before_the_endpoint():
+    client, calls = make_client()
+
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * (LIMIT * 4))})
+
+    assert response.status_code == 413
+    assert response.json()["message"] == "çok büyük"
+    assert calls == []
+
+
+def test_chunked_upload_is_cut_off_at_the_limit():
+    client, calls = make_client()
+
+    def body():
+        for _ in range(16):
+            yield b"x" * 1024
+
+    response = client.post("/upload", content=body(), headers={"content-type": "multipart/form-data; boundary=b"})
+
+    assert response.status_code == 413
+    assert calls == []
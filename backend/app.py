@@ -10,6 +10,8 @@ from routers.chat           import chat_bp
 from routers.exam           import exam_bp
 from routers.progress       import progress_bp
 import config
+from utils.auth import register_auth_callbacks
+from database import ensure_indexes
 
 if os.getenv("FLASK_ENV") == "development":
     base_dir = Path(__file__).resolve().parent
@@ -17,6 +19,8 @@ if os.getenv("FLASK_ENV") == "development":
 
 app = Flask(__name__)
 
+ensure_indexes()
+
 frontend_origins = os.getenv("FRONTEND_ROOT", "").split(",")
 CORS(app, resources={r"/api/*": {"origins": frontend_origins}})
 
@@ -25,6 +29,7 @@ app.config["JWT_TOKEN_LOCATION"]       = config.JWT_TOKEN_LOCATION
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = config.JWT_ACCESS_TOKEN_EXPIRES
 
 jwt = JWTManager(app)
+register_auth_callbacks(jwt)
 
 app.register_blueprint(auth_bp,      url_prefix='/api/auth')
 app.register_blueprint(chat_bp,      url_prefix='/api/chat')
@@ -0,0 +1,26 @@
+import os
+
+import mongomock
+import pytest
+
+# database.py üretimde DB_ADDRESS ister; testler bellek içi mongomock ile çalışır
+os.environ.setdefault("FLASK_ENV", "development")
+
+import database
+
+database.client = mongomock.MongoClient()
+database.db = database.client["yks"]
+
+
+@pytest.fixture
+def app():
+    from app import app as flask_app
+    flask_app.config["TESTING"] = True
+    return flask_app
+
+
+@pytest.fixture
+def db():
+    for name in database.db.list_collection_names():
+        database.db[name].delete_many({})
+    return database.db
@@ -1,7 +1,8 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 
 env = os.getenv("FLASK_ENV", "production")
 
@@ -19,4 +20,23 @@ if not db_uri:
 print(f"[{env}] Using DB URI: {db_uri}")
 
 client = MongoClient(db_uri)
-db = client["yks"]
\ No newline at end of file
+db = client["yks"]
+
+def ensure_indexes():
+    """
+    Uygulama açılışında gerekli indeksleri oluşturur (var olanlar için işlem yapılmaz)
+    """
+    indexes = [
+        # Giriş ve kayıt e-posta ile sorgular; benzersizlik eşzamanlı kayıtlarda çift hesabı önler
+        ("users", [("email", ASCENDING)], {"unique": True, "name": "email_unique"}),
+        # Sınavlar kullanıcı belgesine gömülüdür ve _id ile sorgulanır, ek indeks gerekmez
+        ("ai-chat-messages", [("user_id", ASCENDING), ("chat_id", ASCENDING), ("seq", ASCENDING)], {"unique": True}),
+        ("ai-chat-histories", [("user_id", ASCENDING), ("updated_at", DESCENDING)], {}),
+    ]
+
+    for collection, keys, options in indexes:
+        try:
+            db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            # Ör. mevcut çift e-posta kayıtları benzersiz indeksi engelliyorsa uygulama yine açılır
+            print(f"{collection} indeks oluşturma hatası: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+users.ai-chat-histories içinde gömülü sohbetleri ai-chat-histories / ai-chat-messages
+koleksiyonlarına taşıyan tek seferlik betik.
+
+Tekrar çalıştırılabilir: mesajlar (user_id, chat_id, seq) anahtarıyla upsert edilir.
+
+Kullanım:
+    python migrate_chat_histories.py [--keep-embedded]
+"""
+import argparse
+import datetime
+
+from pymongo import UpdateOne
+
+from database import db, ensure_indexes
+from routers.chat import users_collection, chats_collection, messages_collection
+
+
+def migrate(keep_embedded=False):
+    ensure_indexes()
+    now = datetime.datetime.utcnow()
+    migrated_users = 0
+    migrated_chats = 0
+    migrated_messages = 0
+
+    cursor = users_collection.find(
+        {"ai-chat-histories": {"$exists": True}},
+        {"_id": 1, "ai-chat-histories": 1}
+    )
+    for user in cursor:
+        user_id = user["_id"]
+        for chat in user.get("ai-chat-histories") or []:
+            chat_id = chat["_id"]
+            messages = chat.get("messages") or []
+
+            if messages:
+                messages_collection.bulk_write([
+                    UpdateOne(
+                        {"user_id": user_id, "chat_id": chat_id, "seq": seq},
+                        {"$setOnInsert": {
+                            "text": message.get("text", ""),
+                            "sender": message.get("sender", ""),
+                            "created_at": now
+                        }},
+                        upsert=True
+                    )
+                    for seq, message in enumerate(messages)
+                ], ordered=False)
+
+            # Eski sohbet belgesindeki gömülü mesaj kopyası da kaldırılır.
+            # $min alan yoksa yazar, varsa (daha eski olduğu için) dokunmaz; updated_at
+            # eksik olan mevcut sohbetlere de eklenir
+            chats_collection.update_one(
+                {"_id": chat_id},
+                {
+                    "$set": {"user_id": user_id},
+                    "$max": {"next_seq": len(messages)},
+                    "$min": {"updated_at": now},
+                    "$setOnInsert": {"created_at": now},
+                    "$unset": {"messages": ""}
+                },
+                upsert=True
+            )
+
+            migrated_chats += 1
+            migrated_messages += len(messages)
+
+        if not keep_embedded:
+            users_collection.update_one({"_id": user_id}, {"$unset": {"ai-chat-histories": ""}})
+        migrated_users += 1
+
+    print(f"{migrated_users} kullanıcı, {migrated_chats} sohbet, {migrated_messages} mesaj taşındı ({db.name})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gömülü sohbet geçmişlerini mesaj koleksiyonuna taşı")
+    parser.add_argument("--keep-embedded", action="store_true", help="users belgelerindeki eski diziyi silme")
+    args = parser.parse_args()
+    migrate(keep_embedded=args.keep_embedded)
@@ -1,15 +1,21 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
 import jwt
 import datetime
-import bcrypt
 from database import db
 from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
 import config  # Güncellenmiş `config.py` dosyasını içe aktarıyoruz
+from utils.user_access import LOGIN_PROJECTION
+from utils.auth import remember_token_expiry, auth_stats
+from utils.passwords import hash_password, verify_password, needs_rehash, busy_response_headers, PasswordPoolBusy
 
 auth_bp = Blueprint('auth', __name__)
 
 users_collection = db["users"]
 
+BUSY_MESSAGE = 'Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.'
+
 def generate_token(user_id):
     exp_time = datetime.datetime.utcnow() + datetime.timedelta(seconds=config.JWT_ACCESS_TOKEN_EXPIRES)
     token = jwt.encode(
@@ -32,28 +38,31 @@ def register():
     if not username or not email or not password:
         return jsonify({'message': 'Kullanıcı adı, e-posta ve şifre gereklidir!'}), 400
 
-    existing_user = users_collection.find_one({"email": email})
-    if existing_user:
-        return jsonify({'message': 'Bu e-posta adresi ile kayıtlı bir kullanıcı zaten var!'}), 400
-
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+    # bcrypt ayrı süreç havuzunda çalışır (salt hash'in içinde saklanır)
+    try:
+        hashed_password = hash_password(password)
+    except PasswordPoolBusy:
+        return jsonify({'message': BUSY_MESSAGE}), 503, busy_response_headers()
 
     user_data = {
         "username": username,
         "email": email,
-        "password": hashed_password.decode('utf-8'),
-        "salt": salt.decode('utf-8'),
+        "password": hashed_password,
         "token_expiry": datetime.datetime.utcnow() + datetime.timedelta(seconds=config.JWT_ACCESS_TOKEN_EXPIRES),
     }
 
-    inserted_user = users_collection.insert_one(user_data)
+    # E-posta benzersizliği users.email indeksiyle garanti edilir (database.ensure_indexes)
+    try:
+        inserted_user = users_collection.insert_one(user_data)
+    except DuplicateKeyError:
+        return jsonify({'message': 'Bu e-posta adresi ile kayıtlı bir kullanıcı zaten var!'}), 400
     token, exp_time = generate_token(inserted_user.inserted_id)
 
     users_collection.update_one(
         {"_id": inserted_user.inserted_id},
         {"$set": {"token_expiry": exp_time}}
     )
+    remember_token_expiry(inserted_user.inserted_id, exp_time)
 
     return jsonify({'message': 'Kullanıcı başarıyla kaydedildi!', 'token': token}), 201
 
@@ -66,20 +75,28 @@ def login():
     if not email or not password:
         return jsonify({'message': 'E-posta ve şifre gereklidir!'}), 400
     
-    user = users_collection.find_one({"email": email})
+    user = users_collection.find_one({"email": email}, LOGIN_PROJECTION)
     if not user:
         return jsonify({'message': 'Geçersiz e-posta veya şifre!'}), 401
     
-    stored_salt = user["salt"].encode('utf-8')
-    stored_hashed_password = user["password"].encode('utf-8')
-    
-    hashed_input_password = bcrypt.hashpw(password.encode('utf-8'), stored_salt)
-    
-    if hashed_input_password != stored_hashed_password:
-        return jsonify({'message': 'Geçersiz e-posta veya şifre!'}), 401
+    try:
+        if not verify_password(password, user["password"]):
+            return jsonify({'message': 'Geçersiz e-posta veya şifre!'}), 401
+    except PasswordPoolBusy:
+        return jsonify({'message': BUSY_MESSAGE}), 503, busy_response_headers()
     
     user_id = str(user["_id"])
     
+    # Eski maliyet faktörüyle saklanan şifreyi güncel faktöre yükselt
+    if needs_rehash(user["password"]):
+        try:
+            users_collection.update_one(
+                {"_id": user["_id"]},
+                {"$set": {"password": hash_password(password)}, "$unset": {"salt": ""}}
+            )
+        except PasswordPoolBusy:
+            pass
+    
     if "token_expiry" in user and datetime.datetime.utcnow() < user["token_expiry"]:
         token = jwt.encode(
             {
@@ -92,5 +109,14 @@ def login():
     else:
         token, exp_time = generate_token(user_id)
         users_collection.update_one({"_id": ObjectId(user_id)}, {"$set": {"token_expiry": exp_time}})
+        remember_token_expiry(user_id, exp_time)
     
     return jsonify({'token': token}), 200
+
+@auth_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def stats():
+    """
+    Token kontrollerinin kaçının önbellekten, kaçının MongoDB'den karşılandığını döndürür (bu worker için)
+    """
+    return jsonify(auth_stats()), 200
@@ -1,17 +1,24 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from database import db
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson.objectid import ObjectId
+from pymongo import DESCENDING, ReturnDocument
 import datetime
-import requests
 import config
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 import json
+from utils.chat_client import ChatClient
+from utils.user_access import users_collection, get_authenticated_user, to_object_id, EXAMS_PROJECTION
 
 chat_bp = Blueprint('chat', __name__)
-users_collection = db["users"]
+# Sohbet başına bir belge (sahibi ve sıradaki mesaj numarası), mesajlar ayrı koleksiyonda tutulur
+chats_collection = db["ai-chat-histories"]
+messages_collection = db["ai-chat-messages"]
+
+CHAT_HISTORY_PAGE_SIZE = 50
+CHAT_HISTORY_MAX_PAGE_SIZE = 200
 
 env = os.getenv("FLASK_ENV", "production")
 
@@ -19,39 +26,118 @@ if env == "development":
     base_dir = Path(__file__).resolve().parent
     load_dotenv(dotenv_path=base_dir / ".env.development", override=True)
 
-chat_root_url = os.getenv("CHAT_ROOT", "").split(",")
-chat_root_url = chat_root_url[0]
-
-print(f"[{env}] Using CHAT URL: {chat_root_url}")
+chat_root_urls = [url.strip() for url in os.getenv("CHAT_ROOT", "").split(",") if url.strip()]
 
-def is_token_valid(user):
-    if "token_expiry" not in user or datetime.datetime.utcnow() > user["token_expiry"]:
-        return False
-    return True
+# Tüm istekler aynı bağlantı havuzunu ve devre kesiciyi paylaşır
+chat_client = ChatClient(
+    chat_root_urls,
+    connect_timeout=float(os.getenv("CHAT_CONNECT_TIMEOUT", "3")),
+    read_timeout=float(os.getenv("CHAT_READ_TIMEOUT", "60")),
+    pool_size=int(os.getenv("CHAT_POOL_SIZE", "20")),
+    failure_threshold=int(os.getenv("CHAT_FAILURE_THRESHOLD", "3")),
+    reset_timeout=float(os.getenv("CHAT_RESET_TIMEOUT", "30"))
+)
 
-def add_message_to_chat(user_id, chat_id, text, sender_type):
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
+print(f"[{env}] Using CHAT URLs: {chat_root_urls}")
 
-    if not user or "ai-chat-histories" not in user:
+def chat_exists(user_id, chat_id):
+    chat_oid = to_object_id(chat_id)
+    if chat_oid is None:
+        return False
+    return chats_collection.find_one({"_id": chat_oid, "user_id": ObjectId(user_id)}, {"_id": 1}) is not None
+
+def add_messages_to_chat(user_id, chat_id, messages):
+    """
+    Mesajları sohbetin sonuna ekler; sıra numaraları $inc ile atomik olarak ayrılır
+    """
+    chat_oid = to_object_id(chat_id)
+    if chat_oid is None:
         return None
 
-    chat = next((chat for chat in user["ai-chat-histories"] if str(chat["_id"]) == chat_id), None)
+    now = datetime.datetime.utcnow()
+    chat = chats_collection.find_one_and_update(
+        {"_id": chat_oid, "user_id": ObjectId(user_id)},
+        {"$inc": {"next_seq": len(messages)}, "$set": {"updated_at": now}},
+        projection={"next_seq": 1},
+        return_document=ReturnDocument.AFTER
+    )
     if not chat:
         return None
 
-    chat["messages"].append({"text": text, "sender": sender_type})
+    first_seq = chat["next_seq"] - len(messages)
+    messages_collection.insert_many([
+        {
+            "user_id": ObjectId(user_id),
+            "chat_id": chat_oid,
+            "seq": first_seq + i,
+            "text": message["text"],
+            "sender": message["sender"],
+            "created_at": now
+        }
+        for i, message in enumerate(messages)
+    ])
+
+    return first_seq
 
-    users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": {"ai-chat-histories": user["ai-chat-histories"]}}
+def add_message_to_chat(user_id, chat_id, text, sender_type):
+    return add_messages_to_chat(user_id, chat_id, [{"text": text, "sender": sender_type}])
+
+def get_chat_messages(user_id, chat_id, limit=CHAT_HISTORY_PAGE_SIZE, before=None):
+    """
+    Sohbetin son `limit` mesajını (before verilirse o sıra numarasından öncekileri) eskiden yeniye döndürür
+
+    limit None ise sohbetin tüm mesajları döner.
+    """
+    query = {"user_id": ObjectId(user_id), "chat_id": to_object_id(chat_id)}
+    if before is not None:
+        query["seq"] = {"$lt": before}
+
+    if limit is None:
+        return list(messages_collection.find(query, {"_id": 0, "seq": 1, "text": 1, "sender": 1}).sort("seq", 1))
+
+    messages = list(
+        messages_collection.find(query, {"_id": 0, "seq": 1, "text": 1, "sender": 1})
+        .sort("seq", DESCENDING)
+        .limit(limit)
+    )
+    messages.reverse()
+    return messages
+
+def build_chat_query(user, user_message):
+    exams = user.get("exams", [])
+    full_query = (
+        "Sınav bilgileri:\n" +
+        json.dumps(exams, ensure_ascii=False, indent=2) +
+        "\n\nKullanıcı mesajı:\n" +
+        user_message
     )
+    return f"Sınavlar:\n{full_query}\n\nKullanıcı: {user_message}"
+
+def create_chat(user_id, messages):
+    now = datetime.datetime.utcnow()
+    chat_id = ObjectId()
 
-    return chat["messages"]
+    chats_collection.insert_one({
+        "_id": chat_id,
+        "user_id": ObjectId(user_id),
+        "next_seq": 0,
+        "created_at": now,
+        "updated_at": now
+    })
+
+    if messages:
+        add_messages_to_chat(user_id, chat_id, messages)
+
+    return chat_id
+
+def sse_event(event, data):
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {data}\n\n"
 
 @chat_bp.route('/update-chat', methods=['POST'])
 @jwt_required()
 def chat():
-    global chat_root_url
     user_id = get_jwt_identity()
     data = request.json
     chat_type = data.get("type")
@@ -60,94 +146,142 @@ def chat():
     if not user_message:
         return jsonify({"error": "Boş mesaj gönderilemez"}), 400
 
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
-
-    if not user:
-        return jsonify({"error": "Kullanıcı bulunamadı"}), 404
-
-    if not is_token_valid(user):
-        return jsonify({"error": "Token geçersiz veya süresi dolmuş"}), 401
-
-    if "ai-chat-histories" not in user:
-        user["ai-chat-histories"] = []
+    user = get_authenticated_user(user_id, EXAMS_PROJECTION)
+    if not isinstance(user, dict):
+        return user
 
     if chat_type == 1:
         if config.chat_test_mode == True:
             model_response = "Hello World"
         else:
             # FastAPI backend'e istek gönder
-            exams = user.get("exams", [])
-            full_query = (
-                "Sınav bilgileri:\n" +
-                json.dumps(exams, ensure_ascii=False, indent=2) +
-                "\n\nKullanıcı mesajı:\n" +
-                user_message
-            )
-            full_query = f"Sınavlar:\n{full_query}\n\nKullanıcı: {user_message}"
+            full_query = build_chat_query(user, user_message)
             payload = {"query": full_query, "user_id": str(user_id)}
             try:
-                resp = requests.post(chat_root_url + "/query", json=payload)
+                resp = chat_client.post("/query", payload)
                 resp.raise_for_status()
                 model_response = resp.json().get("response", "")
             except Exception as e:
                 model_response = f"Hata: {e}"
 
-        new_chat = {
-            "_id": ObjectId(),
-            "messages": [
-                {"text": user_message, "sender": "sender"},
-                {"text": model_response, "sender": "receiver"}
-            ]
-        }
-
-        inserted_chat = db["ai-chat-histories"].insert_one(new_chat)
-
-        user["ai-chat-histories"].append({
-            "_id": inserted_chat.inserted_id,
-            "messages": new_chat["messages"]
-        })
+        chat_id = create_chat(user_id, [
+            {"text": user_message, "sender": "sender"},
+            {"text": model_response, "sender": "receiver"}
+        ])
 
-        users_collection.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": {"ai-chat-histories": user["ai-chat-histories"]}}
-        )
-
-        return jsonify({"chatId": str(inserted_chat.inserted_id)})
+        return jsonify({"chatId": str(chat_id)})
 
     elif chat_type == 2:
         chat_id = data.get("chatId")
         if not chat_id:
             return jsonify({"error": "chatId eksik"}), 400
 
-        messages = add_message_to_chat(user_id, chat_id, user_message, "sender")
-        if messages is None:
+        if not chat_exists(user_id, chat_id):
             return jsonify({"error": "Sohbet bulunamadı"}), 404
 
         if getattr(config, 'chat_test_mode', False):
             model_response = "Hello World"
         else:
-            exams = user.get("exams", [])
-            full_query = (
-                "Sınav bilgileri:\n" +
-                json.dumps(exams, ensure_ascii=False, indent=2) +
-                "\n\nKullanıcı mesajı:\n" +
-                user_message
-            )
-            full_query = f"Sınavlar:\n{full_query}\n\nKullanıcı: {user_message}"
+            full_query = build_chat_query(user, user_message)
             payload = {"query": full_query, "user_id": str(user_id)}
             try:
-                resp = requests.post(chat_root_url + "/query", json=payload)
+                resp = chat_client.post("/query", payload)
                 resp.raise_for_status()
                 model_response = resp.json().get("response", "")
             except Exception as e:
                 model_response = f"Hata: {e}"
 
-        messages = add_message_to_chat(user_id, chat_id, model_response, "receiver")
+        add_messages_to_chat(user_id, chat_id, [
+            {"text": user_message, "sender": "sender"},
+            {"text": model_response, "sender": "receiver"}
+        ])
 
-        return jsonify({"messages": messages})
+        # Yanıt eskisi gibi sohbetin tüm mesajlarını içerir; sayfalı okuma için /chat-history kullanılır
+        return jsonify({"messages": get_chat_messages(user_id, chat_id, limit=None)})
 
     return jsonify({"error": "Geçersiz istek"}), 400
 
+@chat_bp.route('/update-chat/stream', methods=['POST'])
+@jwt_required()
+def chat_stream():
+    """
+    /update-chat ile aynı gövdeyi alır, yanıtı FastAPI /query/stream'den
+    Server-Sent Events olarak aktarır ve akış bitince mesajı kaydeder
+    """
+    user_id = get_jwt_identity()
+    data = request.json
+    chat_type = data.get("type")
+    user_message = data.get("message", "").strip()
+
+    if not user_message:
+        return jsonify({"error": "Boş mesaj gönderilemez"}), 400
+
+    user = get_authenticated_user(user_id, EXAMS_PROJECTION)
+    if not isinstance(user, dict):
+        return user
+
+    if chat_type == 1:
+        chat_id = str(create_chat(user_id, []))
+    elif chat_type == 2:
+        chat_id = data.get("chatId")
+        if not chat_id:
+            return jsonify({"error": "chatId eksik"}), 400
+
+        if not chat_exists(user_id, chat_id):
+            return jsonify({"error": "Sohbet bulunamadı"}), 404
+    else:
+        return jsonify({"error": "Geçersiz istek"}), 400
+
+    payload = {"query": build_chat_query(user, user_message), "user_id": str(user_id)}
+
+    def generate():
+        yield sse_event("chat", {"chatId": chat_id})
+
+        parts = []
+        model_response = None
+        try:
+            if getattr(config, 'chat_test_mode', False):
+                parts.append("Hello World")
+                yield sse_event("token", "Hello World")
+                model_response = "Hello World"
+                return
+
+            with chat_client.post("/query/stream", payload, stream=True, read_timeout=120) as resp:
+                resp.raise_for_status()
+                resp.encoding = "utf-8"
+
+                event, event_data = "message", ""
+                for line in resp.iter_lines(decode_unicode=True):
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        event_data = line[len("data:"):].strip()
+                    elif line == "":
+                        # Olay tamamlandı, istemciye aynen aktar
+                        if event == "token":
+                            parts.append(json.loads(event_data))
+                        elif event in ("done", "error"):
+                            model_response = json.loads(event_data).get("response", "")
+                        yield sse_event(event, event_data)
+                        event, event_data = "message", ""
+        except Exception as e:
+            model_response = f"Hata: {e}"
+            yield sse_event("error", {"response": model_response})
+        finally:
+            # İstemci akış bitmeden ayrılsa bile o ana kadar üretilen yanıt kaydedilir
+            if model_response is None:
+                model_response = "".join(parts)
+            add_messages_to_chat(user_id, chat_id, [
+                {"text": user_message, "sender": "sender"},
+                {"text": model_response, "sender": "receiver"}
+            ])
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @chat_bp.route('/chat-history', methods=['POST'])
 @jwt_required()
 def chat_history():
@@ -158,17 +292,26 @@ def chat_history():
     if not chat_id:
         return jsonify({"error": "chatId eksik"}), 400
 
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
-
-    if not user:
-        return jsonify({"error": "Kullanıcı bulunamadı"}), 404
+    try:
+        limit = min(int(data.get("limit", CHAT_HISTORY_PAGE_SIZE)), CHAT_HISTORY_MAX_PAGE_SIZE)
+        before = data.get("before")
+        before = int(before) if before is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit ve before sayı olmalıdır"}), 400
 
-    if not is_token_valid(user):
-        return jsonify({"error": "Token geçersiz veya süresi dolmuş"}), 401
+    if limit < 1:
+        return jsonify({"error": "limit en az 1 olmalıdır"}), 400
 
-    chat = next((chat for chat in user["ai-chat-histories"] if str(chat["_id"]) == chat_id), None)
+    user = get_authenticated_user(user_id)
+    if not isinstance(user, dict):
+        return user
 
-    if not chat:
+    if not chat_exists(user_id, chat_id):
         return jsonify({"error": "Sohbet bulunamadı"}), 404
 
-    return jsonify({"messages": chat["messages"]})
+    messages = get_chat_messages(user_id, chat_id, limit, before)
+
+    # Daha eski mesajlar için bir sonraki istekte before olarak gönderilecek sıra numarası
+    next_before = messages[0]["seq"] if messages and messages[0]["seq"] > 0 else None
+
+    return jsonify({"messages": messages, "nextBefore": next_before})
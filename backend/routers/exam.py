@@ -1,11 +1,10 @@
 from flask import Blueprint, request, jsonify
-from database import db
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson.objectid import ObjectId
 import datetime
+from utils.user_access import users_collection, get_authenticated_user, to_object_id, exam_projection, EXAMS_PROJECTION
 
 exam_bp = Blueprint('exam', __name__)
-users_collection = db["users"]
 
 DEFAULT_RESULTS = {
     "TYT": {
@@ -29,31 +28,7 @@ DEFAULT_RESULTS = {
     }
 }
 
-def is_token_valid(user):
-    if "token_expiry" not in user or datetime.datetime.utcnow() > user["token_expiry"]:
-        return False
-    return True
-
-def get_authenticated_user(user_id):
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
-
-    if not user:
-        return jsonify({"error": "Kullanıcı bulunamadı"}), 404
-
-    if not is_token_valid(user):
-        return jsonify({"error": "Token geçersiz veya süresi dolmuş"}), 401
-
-    return user
-
 def add_exam_to_user(user_id, exam_data):
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
-
-    if not user or not is_token_valid(user):
-        return None
-
-    if "exams" not in user:
-        user["exams"] = []
-
     new_exam = {
         "_id": ObjectId(),
         "name": exam_data["name"],
@@ -61,20 +36,22 @@ def add_exam_to_user(user_id, exam_data):
         "results": exam_data.get("results", DEFAULT_RESULTS.copy())  # Eğer results yoksa default değer koy
     }
 
-    user["exams"].append(new_exam)
-
-    users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": {"exams": user["exams"]}}
+    # Tek atomik $push: dizinin tamamı okunup yazılmaz, eşzamanlı eklemeler birbirini ezmez
+    result = users_collection.update_one(
+        {"_id": ObjectId(user_id), "token_expiry": {"$gt": datetime.datetime.utcnow()}},
+        {"$push": {"exams": new_exam}}
     )
 
+    if result.matched_count == 0:
+        return None
+
     return new_exam
 
 @exam_bp.route('/fetch-exams', methods=['GET'])
 @jwt_required()
 def fetch_exams():
     user_id = get_jwt_identity()
-    user = get_authenticated_user(user_id)
+    user = get_authenticated_user(user_id, EXAMS_PROJECTION)
     if not isinstance(user, dict):
         return user
 
@@ -114,17 +91,22 @@ def add_exam():
 @jwt_required()
 def get_exam():
     user_id = get_jwt_identity()
-    user = get_authenticated_user(user_id)
-    if not isinstance(user, dict):
-        return user
-
     data = request.json
     exam_id = data.get("exam_id")
 
     if not exam_id:
         return jsonify({"error": "exam_id eksik!"}), 400
 
-    exam = next((exam for exam in user.get("exams", []) if str(exam["_id"]) == exam_id), None)
+    exam_oid = to_object_id(exam_id)
+    if exam_oid is None:
+        return jsonify({"error": "Sınav bulunamadı!"}), 404
+
+    # Yalnızca istenen sınav getirilir ($elemMatch)
+    user = get_authenticated_user(user_id, exam_projection(exam_oid))
+    if not isinstance(user, dict):
+        return user
+
+    exam = user["exams"][0] if user.get("exams") else None
 
     if not exam:
         return jsonify({"error": "Sınav bulunamadı!"}), 404
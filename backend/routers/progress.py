@@ -1,26 +1,6 @@
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from bson.objectid import ObjectId
-import datetime
-from database import db
-
-users_collection = db["users"]
-
-def is_token_valid(user):
-    if "token_expiry" not in user or datetime.datetime.utcnow() > user["token_expiry"]:
-        return False
-    return True
-
-def get_authenticated_user(user_id):
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
-
-    if not user:
-        return jsonify({"error": "Kullanıcı bulunamadı"}), 404
-
-    if not is_token_valid(user):
-        return jsonify({"error": "Token geçersiz veya süresi dolmuş"}), 401
-
-    return user
+from utils.user_access import get_authenticated_user, EXAMS_PROJECTION
 
 progress_bp = Blueprint('progress', __name__)
 
@@ -28,8 +8,8 @@ progress_bp = Blueprint('progress', __name__)
 @jwt_required()
 def progress_exam_details():
     user_id = get_jwt_identity()
-    user = get_authenticated_user(user_id)
-    if not user or not is_token_valid(user):
+    user = get_authenticated_user(user_id, EXAMS_PROJECTION)
+    if not isinstance(user, dict):
         return jsonify({"error": "Kullanıcı doğrulanamadı veya token geçersiz."}), 401
 
     if "exams" not in user:
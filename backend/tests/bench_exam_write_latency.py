@@ -0,0 +1,63 @@
+"""
+Sınav ekleme gecikmesinin öğrencinin sınav sayısıyla değişimini ölçer.
+
+$push ile ekleme maliyeti mevcut sınav sayısından bağımsız kalmalıdır. Anlamlı sonuç için
+gerçek MongoDB ile çalıştırın; mongomock her güncellemede belgeyi kopyaladığı için boyutla büyür.
+
+Kullanım (backend dizininden):
+    python tests/bench_exam_write_latency.py --mongo-uri mongodb://127.0.0.1:27017/
+    python tests/bench_exam_write_latency.py            # bellek içi mongomock
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("FLASK_ENV", "development")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sınav ekleme gecikmesi ölçümü")
+    parser.add_argument("--mongo-uri", help="Gerçek MongoDB adresi (verilmezse mongomock)")
+    parser.add_argument("--sizes", default="0,100,1000,5000", help="Önceden eklenecek sınav sayıları")
+    parser.add_argument("--samples", type=int, default=50, help="Her boyutta ölçülecek ekleme sayısı")
+    args = parser.parse_args()
+
+    import database
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        database.client = MongoClient(args.mongo_uri)
+        database.db = database.client["yks_benchmark"]
+    else:
+        import mongomock
+        database.client = mongomock.MongoClient()
+        database.db = database.client["yks"]
+
+    from routers.exam import add_exam_to_user
+    users = database.db["users"]
+
+    print(f"{'sınav sayısı':>12} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        user_id = users.insert_one({
+            "email": f"bench-{size}@example.com",
+            "token_expiry": datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+            "exams": [{"name": f"Eski {i}", "date": "2025-01-01", "results": {}} for i in range(size)]
+        }).inserted_id
+
+        latencies = []
+        for i in range(args.samples):
+            started = time.perf_counter()
+            add_exam_to_user(user_id, {"name": f"Yeni {i}", "date": "2025-06-01"})
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{size:>12} {statistics.median(latencies):>8.2f} {p99:>8.2f}")
+        users.delete_one({"_id": user_id})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Giriş yükü altında giriş hızını ve giriş dışı yolların gecikmesini ölçer.
+
+Önce yalnızca /api/exam/fetch-exams istekleriyle temel gecikme ölçülür, ardından aynı
+istekler eşzamanlı girişler sürerken tekrarlanır. bcrypt süreç havuzunda çalıştığı için
+girişler sürerken fetch-exams p99'u temel değere yakın kalmalı, havuz dolduğunda girişler
+beklemek yerine 503 + Retry-After almalıdır.
+
+Kullanım (backend dizininden):
+    python tests/bench_login_load.py --mongo-uri mongodb://127.0.0.1:27017/
+    python tests/bench_login_load.py --login-threads 32 --duration 10     # bellek içi mongomock
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("FLASK_ENV", "development")
+
+PASSWORD = "Sifre123!"
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))] if values else 0.0
+
+
+def run_reads(app, headers, stop, latencies):
+    client = app.test_client()
+    while not stop.is_set():
+        started = time.perf_counter()
+        client.get("/api/exam/fetch-exams", headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+def run_logins(app, emails, stop, statuses, offset):
+    client = app.test_client()
+    i = offset
+    while not stop.is_set():
+        response = client.post("/api/auth/login", json={"email": emails[i % len(emails)], "password": PASSWORD})
+        statuses[response.status_code] += 1
+        i += 1
+
+
+def measure_reads(app, headers, read_threads, duration, login_threads=0, emails=None):
+    stop = threading.Event()
+    latencies = []
+    statuses = Counter()
+    threads = [threading.Thread(target=run_reads, args=(app, headers, stop, latencies)) for _ in range(read_threads)]
+    threads += [threading.Thread(target=run_logins, args=(app, emails, stop, statuses, i)) for i in range(login_threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giriş yükü ölçümü")
+    parser.add_argument("--mongo-uri", help="Gerçek MongoDB adresi (verilmezse mongomock)")
+    parser.add_argument("--users", type=int, default=50, help="Giriş yapacak kullanıcı sayısı")
+    parser.add_argument("--login-threads", type=int, default=16, help="Eşzamanlı giriş yapan iş parçacığı")
+    parser.add_argument("--read-threads", type=int, default=4, help="Eşzamanlı fetch-exams yapan iş parçacığı")
+    parser.add_argument("--duration", type=float, default=5.0, help="Her aşamanın süresi (sn)")
+    args = parser.parse_args()
+
+    import database
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        database.client = MongoClient(args.mongo_uri)
+        database.db = database.client["yks_benchmark"]
+    else:
+        import mongomock
+        database.client = mongomock.MongoClient()
+        database.db = database.client["yks"]
+
+    from flask_jwt_extended import create_access_token
+    from app import app
+    from utils.passwords import hash_password, PASSWORD_POOL_SIZE, PASSWORD_MAX_PENDING
+
+    users = database.db["users"]
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    hashed = hash_password(PASSWORD)
+    emails = [f"bench-login-{i}@example.com" for i in range(args.users)]
+    users.insert_many([{"email": email, "password": hashed, "token_expiry": expiry, "exams": []} for email in emails])
+    reader_id = users.insert_one({"email": "bench-reader@example.com", "token_expiry": expiry, "exams": []}).inserted_id
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(reader_id))}"}
+
+    print(f"bcrypt havuzu: {PASSWORD_POOL_SIZE} süreç, en fazla {PASSWORD_MAX_PENDING} bekleyen iş")
+
+    baseline, _ = measure_reads(app, headers, args.read_threads, args.duration)
+    loaded, statuses = measure_reads(app, headers, args.read_threads, args.duration, args.login_threads, emails)
+
+    print(f"{'aşama':<16} {'istek':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, latencies in (("yalnız okuma", baseline), ("giriş yükü", loaded)):
+        print(f"{name:<16} {len(latencies):>7} {statistics.median(latencies):>8.2f} {percentile(latencies, 0.99):>8.2f}")
+
+    succeeded = statuses.get(200, 0)
+    print(f"giriş: {succeeded / args.duration:.1f} başarılı/sn, durumlar: {dict(statuses)}")
+
+    users.delete_many({"email": {"$in": emails + ["bench-reader@example.com"]}})
+
+
+if __name__ == "__main__":
+    main()
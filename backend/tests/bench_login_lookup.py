@@ -0,0 +1,89 @@
+"""
+Girişteki e-posta aramasının gecikmesini kullanıcı sayısına göre ölçer.
+
+Her boyutta arama önce email_unique indeksi olmadan (koleksiyon taraması), sonra
+indeksle ölçülür. Gerçek MongoDB'de explain() ile seçilen plan da yazdırılır;
+mongomock indeks kullanmadığı için anlamlı sonuç yalnızca gerçek sunucuda alınır.
+
+Kullanım (backend dizininden):
+    python tests/bench_login_lookup.py --mongo-uri mongodb://127.0.0.1:27017/
+    python tests/bench_login_lookup.py --sizes 1000,10000      # bellek içi mongomock
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("FLASK_ENV", "development")
+
+BATCH_SIZE = 5000
+
+
+def winning_stage(users, email, projection):
+    try:
+        plan = users.find({"email": email}, projection).limit(1).explain()["queryPlanner"]["winningPlan"]
+    except Exception:
+        return "-"
+    plan = plan.get("queryPlan", plan)
+    stages = []
+    while plan:
+        stages.append(plan.get("stage", "?"))
+        plan = plan.get("inputStage")
+    return ">".join(reversed(stages))
+
+
+def measure(users, emails, projection):
+    latencies = []
+    for email in emails:
+        started = time.perf_counter()
+        users.find_one({"email": email}, projection)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies), p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giriş e-posta araması ölçümü")
+    parser.add_argument("--mongo-uri", help="Gerçek MongoDB adresi (verilmezse mongomock)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Kullanıcı sayıları")
+    parser.add_argument("--samples", type=int, default=200, help="Her ölçümdeki arama sayısı")
+    args = parser.parse_args()
+
+    import database
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        database.client = MongoClient(args.mongo_uri)
+        database.db = database.client["yks_benchmark"]
+    else:
+        import mongomock
+        database.client = mongomock.MongoClient()
+        database.db = database.client["yks"]
+
+    from utils.user_access import LOGIN_PROJECTION
+    users = database.db["bench_login_users"]
+
+    print(f"{'kullanıcı':>10} {'indekssiz p50':>14} {'p99':>8} {'indeksli p50':>13} {'p99':>8}  plan")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        users.drop()
+        for start in range(0, size, BATCH_SIZE):
+            users.insert_many([
+                {"email": f"user-{i}@example.com", "password": "$2b$12$" + "x" * 53}
+                for i in range(start, min(size, start + BATCH_SIZE))
+            ])
+        step = max(size // args.samples, 1)
+        emails = [f"user-{i}@example.com" for i in range(0, size, step)][:args.samples]
+
+        scan = measure(users, emails, LOGIN_PROJECTION)
+        users.create_index("email", unique=True, name="email_unique")
+        indexed = measure(users, emails, LOGIN_PROJECTION)
+        plan = winning_stage(users, emails[0], LOGIN_PROJECTION)
+        print(f"{size:>10} {scan[0]:>14.3f} {scan[1]:>8.3f} {indexed[0]:>13.3f} {indexed[1]:>8.3f}  {plan}")
+
+    users.drop()
+
+
+if __name__ == "__main__":
+    main()
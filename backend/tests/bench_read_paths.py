@@ -0,0 +1,100 @@
+"""
+Okuma yollarında projeksiyonun taşınan bayt ve gecikmeye etkisini ölçer.
+
+Her yol için eski davranış (kullanıcı belgesinin tamamı) ile yeni davranış (yalnızca
+gereken alanlar, tek sınav için $elemMatch) karşılaştırılır. Bayt sayısı dönen belgenin
+BSON boyutudur ve mongomock ile de anlamlıdır; gecikme için gerçek MongoDB kullanın.
+
+Kullanım (backend dizininden):
+    python tests/bench_read_paths.py --mongo-uri mongodb://127.0.0.1:27017/
+    python tests/bench_read_paths.py --exams 500 --chats 50     # bellek içi mongomock
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+import bson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("FLASK_ENV", "development")
+
+
+def measure(find, samples):
+    latencies = []
+    size = 0
+    for _ in range(samples):
+        started = time.perf_counter()
+        doc = find()
+        latencies.append((time.perf_counter() - started) * 1000)
+        size = len(bson.encode(doc)) if doc else 0
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return size, statistics.median(latencies), p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Okuma yolu projeksiyon ölçümü")
+    parser.add_argument("--mongo-uri", help="Gerçek MongoDB adresi (verilmezse mongomock)")
+    parser.add_argument("--exams", type=int, default=200, help="Kullanıcının sınav sayısı")
+    parser.add_argument("--chats", type=int, default=20, help="Belgede gömülü eski sohbet sayısı")
+    parser.add_argument("--messages", type=int, default=40, help="Sohbet başına mesaj sayısı")
+    parser.add_argument("--samples", type=int, default=200, help="Her yol için ölçüm sayısı")
+    args = parser.parse_args()
+
+    import database
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        database.client = MongoClient(args.mongo_uri)
+        database.db = database.client["yks_benchmark"]
+    else:
+        import mongomock
+        database.client = mongomock.MongoClient()
+        database.db = database.client["yks"]
+
+    from bson.objectid import ObjectId
+    from routers.exam import DEFAULT_RESULTS
+    from utils.user_access import EXAMS_PROJECTION, LOGIN_PROJECTION, exam_projection
+    users = database.db["users"]
+
+    exams = [
+        {"_id": ObjectId(), "name": f"Deneme {i}", "date": "2025-01-01", "results": DEFAULT_RESULTS}
+        for i in range(args.exams)
+    ]
+    # Taşınmamış kullanıcılarda sohbetler hâlâ belgenin içinde durabilir
+    chats = [
+        {"_id": ObjectId(), "messages": [{"text": "örnek mesaj " * 20, "sender": "sender"}] * args.messages}
+        for _ in range(args.chats)
+    ]
+    user_id = users.insert_one({
+        "email": "bench@example.com",
+        "password": "$2b$12$" + "x" * 53,
+        "token_expiry": datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+        "exams": exams,
+        "ai-chat-histories": chats
+    }).inserted_id
+    target = exams[len(exams) // 2]["_id"]
+
+    paths = [
+        ("fetch-exams", EXAMS_PROJECTION),
+        ("exam-details", exam_projection(target)),
+        ("login", LOGIN_PROJECTION),
+    ]
+
+    print(f"{'yol':<14} {'önce bayt':>10} {'sonra bayt':>11} {'önce p50':>9} {'sonra p50':>10} {'önce p99':>9} {'sonra p99':>10}")
+    for name, projection in paths:
+        before = measure(lambda: users.find_one({"_id": user_id}), args.samples)
+        after = measure(lambda: users.find_one({"_id": user_id}, projection), args.samples)
+        print(f"{name:<14} {before[0]:>10} {after[0]:>11} {before[1]:>9.2f} {after[1]:>10.2f} {before[2]:>9.2f} {after[2]:>10.2f}")
+
+    # add/edit/delete yolları artık kimlik doğrulaması için belgeyi hiç okumaz
+    before = measure(lambda: users.find_one({"_id": user_id}), args.samples)
+    print(f"{'auth (yazma)':<14} {before[0]:>10} {0:>11} {before[1]:>9.2f} {0:>10.2f} {before[2]:>9.2f} {0:>10.2f}")
+
+    users.delete_one({"_id": user_id})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import datetime
+
+from flask_jwt_extended import create_access_token
+
+from utils import auth
+
+REQUESTS = 20
+
+
+def make_user(app, db, token_expiry, expires_delta=None):
+    user_id = db["users"].insert_one({
+        "email": "ogrenci@example.com",
+        "token_expiry": token_expiry,
+        "exams": []
+    }).inserted_id
+    auth.forget_user(user_id)
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), expires_delta=expires_delta)
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+def test_expired_jwt_keeps_default_message(app, db):
+    _, headers = make_user(
+        app, db,
+        datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+        expires_delta=datetime.timedelta(seconds=-1)
+    )
+
+    response = app.test_client().get("/api/exam/fetch-exams", headers=headers)
+
+    assert response.status_code == 401
+    # Arayüz yeniden giriş penceresini bu mesaja göre açar
+    assert response.get_json()["msg"] == "Token has expired"
+
+
+def test_stale_cached_expiry_is_rechecked_before_rejecting(app, db):
+    future = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    user_id, headers = make_user(app, db, future)
+    # Başka bir worker'daki girişten önce kalmış, süresi geçmiş değer
+    auth.remember_token_expiry(user_id, datetime.datetime.utcnow() - datetime.timedelta(hours=1))
+
+    response = app.test_client().get("/api/exam/fetch-exams", headers=headers)
+
+    assert response.status_code == 200
+    assert auth.get_token_expiry(str(user_id)) > datetime.datetime.utcnow()
+
+
+def test_repeated_requests_hit_mongo_once(app, db):
+    _, headers = make_user(app, db, datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+    client = app.test_client()
+    before = auth.auth_stats()
+
+    for _ in range(REQUESTS):
+        assert client.get("/api/exam/fetch-exams", headers=headers).status_code == 200
+
+    stats = client.get("/api/auth/stats", headers=headers).get_json()
+    checks = stats["checks"] - before["checks"]
+    lookups = stats["db_lookups"] - before["db_lookups"]
+    assert checks == REQUESTS + 1
+    assert lookups == 1
@@ -0,0 +1,54 @@
+import datetime
+
+from bson.objectid import ObjectId
+from flask_jwt_extended import create_access_token
+
+from routers.chat import CHAT_HISTORY_PAGE_SIZE
+
+
+def make_user(app, db):
+    user_id = db["users"].insert_one({
+        "email": "ogrenci@example.com",
+        "token_expiry": datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+        "exams": []
+    }).inserted_id
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+def test_update_chat_returns_full_history(app, db):
+    user_id, headers = make_user(app, db)
+    client = app.test_client()
+
+    chat_id = client.post("/api/chat/update-chat", json={"type": 1, "message": "merhaba"}, headers=headers).get_json()["chatId"]
+    turns = CHAT_HISTORY_PAGE_SIZE // 2 + 5
+    for i in range(turns):
+        response = client.post("/api/chat/update-chat", json={"type": 2, "chatId": chat_id, "message": f"soru {i}"}, headers=headers)
+
+    messages = response.get_json()["messages"]
+    assert len(messages) == 2 * (turns + 1)
+    assert messages[0]["text"] == "merhaba"
+    assert [m["sender"] for m in messages[-2:]] == ["sender", "receiver"]
+
+
+def test_migration_sets_missing_updated_at(db):
+    from migrate_chat_histories import migrate
+
+    user_id = ObjectId()
+    chat_id = ObjectId()
+    old = datetime.datetime(2024, 1, 1)
+    kept_id = ObjectId()
+    # mongomock yeni pymongo'nun bulk_write imzasını desteklemediği için mesajsız sohbetler kullanılır
+    db["users"].insert_one({"_id": user_id, "ai-chat-histories": [
+        {"_id": chat_id, "messages": []},
+        {"_id": kept_id, "messages": []}
+    ]})
+    # Önceki bir çalıştırmadan kalmış, updated_at alanı olmayan ve olan sohbetler
+    db["ai-chat-histories"].insert_one({"_id": chat_id, "user_id": user_id, "next_seq": 0})
+    db["ai-chat-histories"].insert_one({"_id": kept_id, "user_id": user_id, "next_seq": 0, "updated_at": old})
+
+    migrate()
+
+    assert isinstance(db["ai-chat-histories"].find_one({"_id": chat_id})["updated_at"], datetime.datetime)
+    assert db["ai-chat-histories"].find_one({"_id": kept_id})["updated_at"] == old
@@ -0,0 +1,32 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from flask_jwt_extended import create_access_token
+
+PARALLEL_REQUESTS = 50
+
+
+def test_parallel_exam_adds_are_not_lost(app, db):
+    user_id = db["users"].insert_one({
+        "username": "ogrenci",
+        "email": "ogrenci@example.com",
+        "token_expiry": datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+        "exams": []
+    }).inserted_id
+
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def add_exam(i):
+        client = app.test_client()
+        return client.post("/api/exam/add", json={"name": f"Deneme {i}", "date": "2025-06-01"}, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        responses = list(pool.map(add_exam, range(PARALLEL_REQUESTS)))
+
+    assert [r.status_code for r in responses] == [201] * PARALLEL_REQUESTS
+
+    exams = db["users"].find_one({"_id": user_id})["exams"]
+    assert len(exams) == PARALLEL_REQUESTS
+    assert {exam["name"] for exam in exams} == {f"Deneme {i}" for i in range(PARALLEL_REQUESTS)}
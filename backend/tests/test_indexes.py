@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+import database
+from utils.user_access import LOGIN_PROJECTION
+
+
+def test_email_index_is_unique_and_rejects_duplicate_registrations(app, db):
+    database.ensure_indexes()
+    assert db["users"].index_information()["email_unique"]["unique"] is True
+
+    client = app.test_client()
+    payload = {"username": "ogrenci", "email": "ogrenci@example.com", "password": "Sifre123!"}
+    assert client.post("/api/auth/register", json=payload).status_code == 201
+    assert client.post("/api/auth/register", json=payload).status_code == 400
+    assert db["users"].count_documents({"email": "ogrenci@example.com"}) == 1
+
+
+@pytest.mark.skipif(not os.getenv("MONGO_TEST_URI"), reason="explain() için gerçek MongoDB gerekir (MONGO_TEST_URI)")
+def test_login_lookup_uses_the_email_index():
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_TEST_URI"))
+    db = client["yks_index_test"]
+    original = database.db
+    database.db = db
+    try:
+        database.ensure_indexes()
+        db["users"].insert_many([{"email": f"u{i}@example.com", "password": "x"} for i in range(100)])
+
+        plan = db["users"].find({"email": "u42@example.com"}, LOGIN_PROJECTION).limit(1).explain()["queryPlanner"]["winningPlan"]
+
+        # Yeni sürümlerde (SBE) plan queryPlan altında döner
+        plan = plan.get("queryPlan", plan)
+        stages = []
+        while plan:
+            stages.append(plan)
+            plan = plan.get("inputStage")
+        assert any(stage.get("stage") == "IXSCAN" and stage.get("indexName") == "email_unique" for stage in stages)
+    finally:
+        database.db = original
+        client.drop_database("yks_index_test")
@@ -0,0 +1,15 @@
+import threading
+
+from utils import passwords
+
+
+def test_login_returns_503_with_retry_after_when_pool_is_full(app, db, monkeypatch):
+    db["users"].insert_one({"email": "ogrenci@example.com", "password": "$2b$12$" + "x" * 53})
+    # Havuzdaki tüm yerler dolu
+    monkeypatch.setattr(passwords, "_slots", threading.BoundedSemaphore(1))
+    passwords._slots.acquire()
+
+    response = app.test_client().post("/api/auth/login", json={"email": "ogrenci@example.com", "password": "Sifre123!"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(passwords.PASSWORD_RETRY_AFTER_SECONDS)
@@ -0,0 +1,114 @@
+import os
+import time
+import datetime
+import threading
+from collections import OrderedDict
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from flask import jsonify
+
+from database import db
+
+users_collection = db["users"]
+
+# Kullanıcının token_expiry değeri bu süre boyunca bellekten okunur; iptaller en geç bu sürede etkili olur
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_USERS = int(os.getenv("AUTH_CACHE_MAX_USERS", "10000"))
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"checks": 0, "cache_hits": 0, "db_lookups": 0, "stale_refreshes": 0, "revoked": 0}
+
+
+def _load_token_expiry(user_id):
+    try:
+        user = users_collection.find_one({"_id": ObjectId(user_id)}, {"token_expiry": 1})
+    except (InvalidId, TypeError):
+        return None
+    return user.get("token_expiry") if user else None
+
+
+def get_token_expiry(user_id, refresh=False):
+    """
+    Kullanıcının sunucu tarafındaki token_expiry değerini kısa ömürlü önbellekten döndürür
+
+    refresh True ise önbellek atlanıp veritabanından okunur.
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(user_id)
+        if not refresh and entry is not None and now - entry[1] < AUTH_CACHE_TTL_SECONDS:
+            _cache.move_to_end(user_id)
+            _stats["cache_hits"] += 1
+            return entry[0]
+
+    token_expiry = _load_token_expiry(user_id)
+    with _lock:
+        _stats["db_lookups"] += 1
+        _cache[user_id] = (token_expiry, now)
+        _cache.move_to_end(user_id)
+        while len(_cache) > AUTH_CACHE_MAX_USERS:
+            _cache.popitem(last=False)
+    return token_expiry
+
+
+def remember_token_expiry(user_id, token_expiry):
+    """
+    Giriş/kayıtta yazılan yeni token_expiry değerini önbelleğe işler
+    """
+    with _lock:
+        _cache[str(user_id)] = (token_expiry, time.monotonic())
+        _cache.move_to_end(str(user_id))
+
+
+def forget_user(user_id):
+    with _lock:
+        _cache.pop(str(user_id), None)
+
+
+def is_token_revoked(jwt_payload):
+    """
+    İmza ve exp kontrolünü flask_jwt_extended yapar; burada yalnızca kullanıcının
+    silinip silinmediği veya token_expiry'nin geri çekilip çekilmediği kontrol edilir
+
+    Önbellek süreç başınadır: giriş başka bir worker'da yapıldıysa buradaki değer eski
+    olabilir, bu yüzden reddetmeden önce veritabanından tekrar okunur.
+    """
+    token_expiry = get_token_expiry(jwt_payload["sub"])
+    revoked = token_expiry is None or datetime.datetime.utcnow() > token_expiry
+    if revoked:
+        token_expiry = get_token_expiry(jwt_payload["sub"], refresh=True)
+        revoked = token_expiry is None or datetime.datetime.utcnow() > token_expiry
+        with _lock:
+            _stats["stale_refreshes"] += 1
+    with _lock:
+        _stats["checks"] += 1
+        if revoked:
+            _stats["revoked"] += 1
+    return revoked
+
+
+def auth_stats():
+    with _lock:
+        checks = _stats["checks"]
+        return {
+            **_stats,
+            "cached_users": len(_cache),
+            "db_lookups_per_check": round(_stats["db_lookups"] / checks, 4) if checks else None
+        }
+
+
+def register_auth_callbacks(jwt):
+    """
+    JWTManager'a iptal kontrolünü ve hata yanıtlarını bağlar
+    """
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload)
+
+    # Süresi dolan token için flask_jwt_extended'in varsayılan {"msg": "Token has expired"}
+    # yanıtı korunur; arayüz yeniden giriş penceresini bu mesaja göre açar
+    @jwt.revoked_token_loader
+    def revoked_token_response(jwt_header, jwt_payload):
+        return jsonify({"error": "Token geçersiz veya süresi dolmuş"}), 401
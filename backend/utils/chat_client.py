@@ -0,0 +1,168 @@
+import itertools
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ChatServiceUnavailable(Exception):
+    """Tüm chatbot API adresleri devre dışı olduğunda fırlatılır"""
+
+
+class _Endpoint:
+    def __init__(self, url):
+        self.url = url
+        self.failures = 0
+        self.opened_until = 0.0
+        self.probing = False
+        self.requests = 0
+        self.errors = 0
+
+
+class ChatClient:
+    """
+    Chatbot API'ye bağlantı havuzlu istemci
+
+    Birden fazla CHAT_ROOT adresi arasında sırayla (round-robin) dağıtır. Art arda
+    failure_threshold kez bağlanamayan veya 5xx dönen adres reset_timeout saniye
+    devreden çıkarılır; süre dolunca tek bir deneme isteğiyle geri alınır.
+    Hiç sağlıklı adres yoksa istek beklemeden ChatServiceUnavailable ile düşer.
+    """
+
+    def __init__(self, base_urls, connect_timeout=3.0, read_timeout=60.0,
+                 pool_size=20, failure_threshold=3, reset_timeout=30.0):
+        self.endpoints = [_Endpoint(url.rstrip("/")) for url in base_urls]
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        # Keep-alive bağlantılar iş parçacıkları arasında paylaşılır
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(len(self.endpoints), 1), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._cursor = itertools.count()
+
+    def _is_available(self, endpoint, now):
+        if endpoint.failures < self.failure_threshold:
+            return True
+        return now >= endpoint.opened_until and not endpoint.probing
+
+    def _candidates(self):
+        """
+        Bu istek için denenebilecek adresleri sırayla döndürür (devre dışı olanlar hariç)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self.endpoints:
+                return []
+            start = next(self._cursor) % len(self.endpoints)
+            ordered = self.endpoints[start:] + self.endpoints[:start]
+            return [endpoint for endpoint in ordered if self._is_available(endpoint, now)]
+
+    def _reserve(self, endpoint):
+        """
+        İstek gönderilmeden hemen önce çağrılır; yarı açık adres için tek deneme hakkını alır
+
+        Returns:
+            "closed" (sağlıklı), "probe" (deneme hakkı alındı) ya da None (kullanılamaz)
+        """
+        with self._lock:
+            if endpoint.failures < self.failure_threshold:
+                return "closed"
+            if time.monotonic() >= endpoint.opened_until and not endpoint.probing:
+                endpoint.probing = True
+                return "probe"
+            return None
+
+    def _release(self, endpoint):
+        with self._lock:
+            endpoint.probing = False
+
+    def _record_success(self, endpoint):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.failures = 0
+            endpoint.probing = False
+
+    def _record_failure(self, endpoint):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.errors += 1
+            endpoint.failures += 1
+            endpoint.probing = False
+            if endpoint.failures >= self.failure_threshold:
+                endpoint.opened_until = time.monotonic() + self.reset_timeout
+                print(f"Chatbot API devre dışı bırakıldı ({endpoint.url}), {self.reset_timeout:.0f} sn sonra tekrar denenecek")
+
+    def post(self, path, payload, stream=False, read_timeout=None):
+        """
+        İsteği sağlıklı bir adrese gönderir
+
+        Bağlantı hatası veya 5xx yanıtında sıradaki adres denenir. Okuma zaman aşımında
+        sorgu başka adreste tekrar çalıştırılmaz (LLM çağrısı iki kez yapılmasın diye).
+
+        Args:
+            path: "/query" gibi istek yolu
+            payload: JSON gövdesi
+            stream: Yanıt gövdesi akış olarak okunacaksa True (çağıran yanıtı kapatmalıdır)
+            read_timeout: Verilirse varsayılan okuma zaman aşımı yerine kullanılır
+
+        Returns:
+            requests.Response
+        """
+        candidates = self._candidates()
+        if not candidates:
+            raise ChatServiceUnavailable("Chatbot API şu anda kullanılamıyor")
+
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+        last_error = None
+        for endpoint in candidates:
+            # Başka bir istek bu adresin deneme hakkını almış olabilir
+            reservation = self._reserve(endpoint)
+            if reservation is None:
+                continue
+
+            try:
+                try:
+                    resp = self.session.post(endpoint.url + path, json=payload, stream=stream, timeout=timeout)
+                except requests.exceptions.ReadTimeout:
+                    self._record_failure(endpoint)
+                    raise
+                except requests.exceptions.RequestException as e:
+                    self._record_failure(endpoint)
+                    last_error = e
+                    continue
+
+                if resp.status_code >= 500:
+                    self._record_failure(endpoint)
+                    last_error = requests.exceptions.HTTPError(f"{resp.status_code} {endpoint.url}{path}", response=resp)
+                    resp.close()
+                    continue
+
+                self._record_success(endpoint)
+                return resp
+            finally:
+                # Sonuç kaydedilmeden çıkıldıysa (beklenmeyen hata) deneme hakkı geri bırakılır
+                if reservation == "probe":
+                    self._release(endpoint)
+
+        raise ChatServiceUnavailable(f"Chatbot API yanıt vermiyor: {last_error}")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": endpoint.url,
+                    "available": self._is_available(endpoint, now),
+                    "consecutive_failures": endpoint.failures,
+                    "requests": endpoint.requests,
+                    "errors": endpoint.errors
+                }
+                for endpoint in self.endpoints
+            ]
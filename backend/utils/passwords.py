@@ -0,0 +1,82 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+# Yeni hash'lerin maliyet faktörü; daha düşük faktörle saklanan şifreler girişte yeniden hash'lenir
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", "0")) or os.cpu_count() or 1
+# Havuzda çalışan + bekleyen en fazla iş; dolunca istek beklemeden reddedilir
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", str(PASSWORD_POOL_SIZE * 4)))
+PASSWORD_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_TIMEOUT_SECONDS", "10"))
+PASSWORD_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_RETRY_AFTER_SECONDS", "2"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_MAX_PENDING)
+
+
+class PasswordPoolBusy(Exception):
+    """Şifre havuzu dolu olduğunda fırlatılır (istemciye 503 + Retry-After dönülür)"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(password, hashed):
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        return False
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_POOL_SIZE)
+        return _pool
+
+
+def _run(func, *args):
+    """
+    bcrypt işini süreç havuzunda çalıştırır; havuz doluysa PasswordPoolBusy fırlatır
+    """
+    if not _slots.acquire(blocking=False):
+        raise PasswordPoolBusy()
+
+    try:
+        future = _get_pool().submit(func, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        return future.result(timeout=PASSWORD_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        raise PasswordPoolBusy()
+
+
+def hash_password(password):
+    return _run(_hash, password, BCRYPT_ROUNDS)
+
+
+def verify_password(password, hashed):
+    return _run(_verify, password, hashed)
+
+
+def needs_rehash(hashed):
+    """
+    Hash'in maliyet faktörü ($2b$<rounds>$...) yapılandırılandan düşükse True döner
+    """
+    try:
+        return int(hashed.split("$")[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def busy_response_headers():
+    return {"Retry-After": str(PASSWORD_RETRY_AFTER_SECONDS)}
@@ -0,0 +1,46 @@
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from flask import jsonify
+
+from database import db
+
+users_collection = db["users"]
+
+# Giriş için gerekli alanlar (sınavlar ve sohbetler taşınmaz)
+LOGIN_PROJECTION = {"password": 1, "token_expiry": 1}
+EXAMS_PROJECTION = {"exams": 1}
+
+
+def to_object_id(value):
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def get_authenticated_user(user_id, projection=None):
+    """
+    Doğrulanmış kullanıcının istenen alanlarını getirir
+
+    Token imzası, exp ve iptal durumu jwt_required (utils.auth) tarafından kontrol edilir;
+    projection verilmezse veritabanına hiç gidilmez.
+
+    Returns:
+        Kullanıcı belgesi ya da (jsonify yanıtı, durum kodu)
+    """
+    if not projection:
+        return {"_id": ObjectId(user_id)}
+
+    user = users_collection.find_one({"_id": ObjectId(user_id)}, projection)
+
+    if not user:
+        return jsonify({"error": "Kullanıcı bulunamadı"}), 404
+
+    return user
+
+
+def exam_projection(exam_id):
+    """
+    exams dizisinden yalnızca istenen sınavı getiren projeksiyon
+    """
+    return {"exams": {"$elemMatch": {"_id": exam_id}}}